@@ -0,0 +1,179 @@
+"""
+Agent Pool for Business Plan Creator
+
+Keeps compiled Deep Agents around between requests instead of rebuilding the
+graph, tool schemas and middleware for every /api/chat call.
+
+Agents are keyed by a hash of their system prompt, tool list and per-agent
+profile (model, limits), so an agent is only rebuilt when its spec actually
+changes. Compiled agents hold no per-run state, so a borrowed agent can serve
+concurrent requests.
+"""
+
+import json
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, List, Any, Optional, Sequence
+
+# Builds a compiled agent from (system_prompt, tools, profile)
+AgentBuilder = Callable[[str, List[Any], Optional[Dict[str, Any]]], Any]
+
+def _tool_name(tool: Any) -> str:
+    return getattr(tool, 'name', None) or getattr(tool, '__name__', repr(tool))
+
+def pool_key(system_prompt: str, tools: Sequence[Any], profile: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Compute the pool key for an agent.
+
+    Args:
+        system_prompt: The agent's system prompt
+        tools: Tools the agent is built with
+        profile: Per-agent settings the agent is built with (model, limits)
+
+    Returns:
+        Hex digest identifying the agent configuration
+    """
+
+    digest = hashlib.sha256(system_prompt.encode('utf-8'))
+    for tool in tools:
+        digest.update(b'\0' + _tool_name(tool).encode('utf-8'))
+    if profile:
+        digest.update(b'\0' + json.dumps(profile, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+class AgentPool:
+    """
+    Pool of compiled agents keyed by spec content hash.
+
+    Each named agent (spec name or "orchestrator") points at the key it was
+    last built with. When a name is rebuilt under a new key, the old agent is
+    dropped unless another name still uses it.
+    """
+
+    def __init__(self, build: AgentBuilder):
+        self._build = build
+        self._agents: Dict[str, Any] = {}
+        self._names: Dict[str, str] = {}
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.build_seconds = 0.0
+        self.last_build_seconds: Dict[str, float] = {}
+
+    def get(
+        self,
+        name: str,
+        system_prompt: str,
+        tools: List[Any],
+        profile: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """
+        Borrow a compiled agent, building it on a miss.
+
+        Args:
+            name: Stable identifier of the agent (spec name or "orchestrator")
+            system_prompt: System prompt the agent is built with
+            tools: Tools the agent is built with
+            profile: Per-agent settings passed through to the builder
+
+        Returns:
+            Compiled Deep Agent instance (shared, safe for concurrent invoke)
+        """
+
+        key = pool_key(system_prompt, tools, profile)
+
+        with self._lock:
+            agent = self._agents.get(key)
+            if agent is not None:
+                self.hits += 1
+                self._bind(name, key)
+                return agent
+            self.misses += 1
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            # Another thread may have finished the same build while we waited
+            agent = self._agents.get(key)
+            if agent is None:
+                agent = self.build(name, system_prompt, tools, profile, key)
+
+        with self._lock:
+            self._bind(name, key)
+        return agent
+
+    def build(
+        self,
+        name: str,
+        system_prompt: str,
+        tools: List[Any],
+        profile: Optional[Dict[str, Any]] = None,
+        key: Optional[str] = None
+    ) -> Any:
+        """
+        Build an agent and store it in the pool, replacing any cached copy.
+
+        Args:
+            name: Stable identifier of the agent
+            system_prompt: System prompt the agent is built with
+            tools: Tools the agent is built with
+            profile: Per-agent settings passed through to the builder
+            key: Precomputed pool key (computed if omitted)
+
+        Returns:
+            The newly compiled agent
+        """
+
+        key = key or pool_key(system_prompt, tools, profile)
+        start = time.perf_counter()
+        agent = self._build(system_prompt, tools, profile)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._agents[key] = agent
+            self._build_locks.pop(key, None)
+            self._bind(name, key)
+            self.builds += 1
+            self.build_seconds += elapsed
+            self.last_build_seconds[name] = elapsed
+
+        return agent
+
+    def evict(self, name: str) -> None:
+        """
+        Drop the agent bound to a name (e.g. after its spec was removed).
+
+        Args:
+            name: Stable identifier of the agent
+        """
+
+        with self._lock:
+            key = self._names.pop(name, None)
+            if key is not None and key not in self._names.values():
+                self._agents.pop(key, None)
+            self.last_build_seconds.pop(name, None)
+
+    def _bind(self, name: str, key: str) -> None:
+        old_key = self._names.get(name)
+        self._names[name] = key
+        if old_key is not None and old_key != key and old_key not in self._names.values():
+            self._agents.pop(old_key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool counters for health/metrics endpoints."""
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._agents),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'builds': self.builds,
+                'build_seconds_total': round(self.build_seconds, 3),
+                'last_build_seconds': {
+                    name: round(seconds, 3) for name, seconds in self.last_build_seconds.items()
+                }
+            }
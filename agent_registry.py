@@ -0,0 +1,1080 @@
+"""
+Agent Registry for Business Plan Creator
+
+Keeps parsed agent specifications in memory so that the API server and the
+orchestrator no longer re-read and re-parse every markdown file in /agents
+on each request.
+
+Features:
+- Process-wide registry, one per agents directory
+- Version counter bumped whenever the set of specs changes
+- Incremental refresh: only files whose mtime/size changed are re-read,
+  and only files whose content hash changed are re-parsed
+- Immutable snapshots swapped in one step, so in-flight requests keep the
+  version they started with
+- Parallel parsing of changed files on a bounded thread pool
+- Lazy specs: listing reads only the frontmatter, system prompts load on
+  first access into a bounded cache
+- Precompiled JSON bundle of parsed specs for YAML-free cold starts
+- Broken specs cached as structured failures by content hash, reported
+  once and through `python agent_registry.py lint`
+- Hot reload: a background watcher (inotify via watchdog, polling fallback)
+  refreshes the registry when files in /agents change
+"""
+
+import os
+import json
+import argparse
+import sys
+import hashlib
+import threading
+import time
+from pathlib import Path
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
+
+import yaml
+
+from token_count import count_tokens, tokenizer_name
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Optional: fall back to polling
+    FileSystemEventHandler = object
+    Observer = None
+
+AGENTS_DIR = Path(__file__).parent / "agents"
+
+# Upper bound on threads used to read/parse changed spec files
+SPEC_PARSE_WORKERS = int(os.getenv('AGENT_SPEC_WORKERS', str(min(8, (os.cpu_count() or 1) + 4))))
+
+# System prompts above this many tokens are flagged in /api/agents
+PROMPT_TOKEN_BUDGET = int(os.getenv('AGENT_PROMPT_TOKEN_BUDGET', '4000'))
+
+# Bump when the bundle layout changes so stale bundles are ignored
+BUNDLE_FORMAT = 4
+
+# libyaml-backed loader when available; it parses several times faster
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# ============================================================================
+# SPEC PARSING
+# ============================================================================
+
+def split_agent_spec(content: str, file_path: Path) -> Tuple[Dict[str, Any], str]:
+    """
+    Split agent specification text into frontmatter and system prompt.
+
+    Args:
+        content: Full text of the agent specification markdown file
+        file_path: Path the content was read from (used in error messages)
+
+    Returns:
+        Tuple of (frontmatter dictionary, system prompt)
+    """
+
+    # Split frontmatter and body; like scan_spec_file, the frontmatter ends at
+    # the first line that is exactly `---` (a `---` inside a value does not)
+    if not content.startswith('---'):
+        raise ValueError(f"No frontmatter found in {file_path}")
+    lines = content.splitlines(keepends=True)
+    for i, line in enumerate(lines[1:], start=1):
+        if line.rstrip() == '---':
+            frontmatter = yaml.load(''.join(lines[1:i]), Loader=_YamlLoader)
+            body = ''.join(lines[i + 1:])
+            break
+    else:
+        raise ValueError(f"Invalid frontmatter in {file_path}")
+
+    if not isinstance(frontmatter, dict):
+        raise ValueError(f"Frontmatter in {file_path} is not a mapping")
+
+    return frontmatter, _extract_system_prompt(body)
+
+def build_spec(frontmatter: Dict[str, Any], system_prompt: str) -> Dict[str, Any]:
+    """
+    Build an agent specification dictionary from parsed parts.
+
+    Args:
+        frontmatter: Parsed YAML frontmatter
+        system_prompt: Extracted system prompt
+
+    Returns:
+        Dictionary containing agent metadata and system prompt
+    """
+
+    return {
+        'name': frontmatter.get('name'),
+        'title': frontmatter.get('title'),
+        'description': frontmatter.get('description'),
+        'enabled': frontmatter.get('enabled', True),
+        'profile': agent_profile(frontmatter),
+        'system_prompt': system_prompt
+    }
+
+def parse_agent_spec_content(content: str, file_path: Path) -> Dict[str, Any]:
+    """
+    Parse agent specification text with YAML frontmatter.
+
+    Args:
+        content: Full text of the agent specification markdown file
+        file_path: Path the content was read from (used in error messages)
+
+    Returns:
+        Dictionary containing agent metadata and system prompt
+    """
+
+    return build_spec(*split_agent_spec(content, file_path))
+
+def parse_agent_spec(file_path: Path) -> Dict[str, Any]:
+    """
+    Parse agent specification from markdown file with YAML frontmatter.
+
+    Args:
+        file_path: Path to the agent specification markdown file
+
+    Returns:
+        Dictionary containing agent metadata and system prompt
+    """
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    return parse_agent_spec_content(content, file_path)
+
+@dataclass
+class SpecError:
+    """Structured reason a spec file could not be loaded."""
+
+    file: str
+    kind: str
+    message: str
+    content_hash: str = ''
+    line: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+# Frontmatter defaults for per-agent performance settings
+DEFAULT_PROFILE = {
+    'deployment': None,           # Azure OpenAI deployment (None = global model)
+    'max_tokens': None,           # completion token cap per LLM call
+    'search_max_results': 5,      # internet_search max_results default
+    'search_type': 'general',     # internet_search search_type default
+    'search_token_budget': None,  # token cap per search call (None = SEARCH_RESULT_TOKEN_BUDGET)
+    'tool_call_limit': None,      # max tool calls per run
+    'timeout_seconds': None       # wall-clock limit per run
+}
+
+def _positive(value: Any, field_name: str, number_type: type = int) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise ValueError(f"'{field_name}' must be a positive number, got {value!r}")
+    if number_type is int and value != int(value):
+        raise ValueError(f"'{field_name}' must be a whole number, got {value!r}")
+    return number_type(value)
+
+def agent_profile(frontmatter: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the per-agent performance profile from spec frontmatter.
+
+    Optional frontmatter fields:
+
+        deployment: gpt-4o-mini    # Azure OpenAI deployment to use
+        max_tokens: 1500           # completion token cap per LLM call
+        search:
+          max_results: 3           # internet_search defaults
+          search_type: news
+          token_budget: 600        # token cap on each search result block
+        tool_call_limit: 15        # max tool calls per run
+        timeout_seconds: 90        # wall-clock limit per run
+
+    Args:
+        frontmatter: Parsed YAML frontmatter
+
+    Returns:
+        Profile dictionary with DEFAULT_PROFILE keys
+
+    Raises:
+        ValueError: If a field has the wrong type or value
+    """
+
+    profile = dict(DEFAULT_PROFILE)
+
+    deployment = frontmatter.get('deployment')
+    if deployment is not None:
+        if not isinstance(deployment, str) or not deployment.strip():
+            raise ValueError(f"'deployment' must be a deployment name, got {deployment!r}")
+        profile['deployment'] = deployment.strip()
+
+    search = frontmatter.get('search') or {}
+    if not isinstance(search, dict):
+        raise ValueError(f"'search' must be a mapping, got {search!r}")
+    unknown = set(search) - {'max_results', 'search_type', 'token_budget'}
+    if unknown:
+        raise ValueError(f"Unknown 'search' field(s): {', '.join(sorted(unknown))}")
+    if search.get('search_type') is not None:
+        if search['search_type'] not in ('general', 'news', 'both'):
+            raise ValueError(
+                f"'search.search_type' must be 'general', 'news' or 'both', got {search['search_type']!r}"
+            )
+        profile['search_type'] = search['search_type']
+
+    profile['max_tokens'] = _positive(frontmatter.get('max_tokens'), 'max_tokens')
+    profile['search_max_results'] = (
+        _positive(search.get('max_results'), 'search.max_results') or DEFAULT_PROFILE['search_max_results']
+    )
+    profile['search_token_budget'] = _positive(search.get('token_budget'), 'search.token_budget')
+    profile['tool_call_limit'] = _positive(frontmatter.get('tool_call_limit'), 'tool_call_limit')
+    profile['timeout_seconds'] = _positive(frontmatter.get('timeout_seconds'), 'timeout_seconds', float)
+
+    return profile
+
+def validate_frontmatter(frontmatter: Any, file_path: Path) -> Optional[SpecError]:
+    """
+    Check parsed frontmatter for the fields the loader relies on.
+
+    Args:
+        frontmatter: Result of parsing the YAML frontmatter block
+        file_path: Path of the spec file (used in error messages)
+
+    Returns:
+        SpecError describing the first problem found, or None if valid
+    """
+
+    if not isinstance(frontmatter, dict):
+        return SpecError(file_path.name, 'not_mapping', f"Frontmatter in {file_path} is not a mapping")
+    if not isinstance(frontmatter.get('name'), str) or not frontmatter['name'].strip():
+        return SpecError(file_path.name, 'missing_field', f"Frontmatter in {file_path} has no 'name'")
+    try:
+        agent_profile(frontmatter)
+    except ValueError as e:
+        return SpecError(file_path.name, 'invalid_profile', f"Invalid profile in {file_path}: {e}")
+    return None
+
+def over_token_budget(prompt_tokens: int) -> bool:
+    """Whether a system prompt of this size exceeds PROMPT_TOKEN_BUDGET."""
+
+    return PROMPT_TOKEN_BUDGET > 0 and prompt_tokens > PROMPT_TOKEN_BUDGET
+
+# ============================================================================
+# LAZY SPECS
+# ============================================================================
+
+# Upper bound on system prompt text kept in memory across all lazy specs
+PROMPT_CACHE_CHARS = int(os.getenv('AGENT_PROMPT_CACHE_CHARS', str(2 * 1024 * 1024)))
+
+# Prompt text is token-counted in chunks of roughly this many bytes
+_TOKEN_CHUNK_BYTES = 64 * 1024
+
+def _extract_system_prompt(body: str) -> str:
+    # Remove the "# System Prompt" header if present
+    system_prompt = body.strip()
+    if system_prompt.startswith('# System Prompt'):
+        system_prompt = '\n'.join(system_prompt.split('\n')[1:]).strip()
+    return system_prompt
+
+def scan_spec_file(file_path: Path) -> Tuple[str, Optional[str], int, int, Optional["SpecError"]]:
+    """
+    Stream a spec file once without keeping its body in memory.
+
+    The frontmatter block is collected up to the closing `---`; the rest of
+    the file is only hashed and token-counted in bounded chunks.
+
+    Args:
+        file_path: Path to the agent specification markdown file
+
+    Returns:
+        Tuple of (content hash, frontmatter text, body byte offset,
+        system prompt token count, SpecError or None)
+    """
+
+    digest = hashlib.sha256()
+    frontmatter_lines: List[bytes] = []
+    body_offset = -1
+    token_count = 0
+    error = None
+
+    with open(file_path, 'rb') as f:
+        first = f.readline()
+        digest.update(first)
+        if not first.startswith(b'---'):
+            error = SpecError(file_path.name, 'no_frontmatter', f"No frontmatter found in {file_path}")
+        else:
+            offset = len(first)
+            for line in f:
+                digest.update(line)
+                offset += len(line)
+                if line.rstrip() == b'---':
+                    body_offset = offset
+                    break
+                frontmatter_lines.append(line)
+            else:
+                error = SpecError(file_path.name, 'invalid_frontmatter', f"Invalid frontmatter in {file_path}")
+
+        # Hash (and, for valid specs, token-count) the body chunk by chunk
+        chunk: List[bytes] = []
+        chunk_size = 0
+        header_checked = False
+        for line in f:
+            digest.update(line)
+            if error is not None:
+                continue
+            if not header_checked and line.strip():
+                header_checked = True
+                if line.lstrip().startswith(b'# System Prompt'):
+                    continue
+            chunk.append(line)
+            chunk_size += len(line)
+            if chunk_size >= _TOKEN_CHUNK_BYTES:
+                token_count += count_tokens(b''.join(chunk).decode('utf-8'))
+                chunk, chunk_size = [], 0
+        if chunk and error is None:
+            token_count += count_tokens(b''.join(chunk).decode('utf-8').strip())
+
+    content_hash = digest.hexdigest()
+    if error is not None:
+        error.content_hash = content_hash
+        return content_hash, None, body_offset, token_count, error
+
+    return content_hash, b''.join(frontmatter_lines).decode('utf-8'), body_offset, token_count, None
+
+class StaleSpecError(RuntimeError):
+    """Raised when a spec's file changed after the spec was loaded and its prompt is not cached."""
+
+class _PromptCache:
+    """Thread-safe LRU cache of system prompts, bounded by total characters."""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Tuple[Path, str], str]" = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Path, str]) -> Optional[str]:
+        with self._lock:
+            prompt = self._items.get(key)
+            if prompt is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._items.move_to_end(key)
+            return prompt
+
+    def put(self, key: Tuple[Path, str], prompt: str) -> None:
+        with self._lock:
+            if key in self._items:
+                self._chars -= len(self._items.pop(key))
+            self._items[key] = prompt
+            self._chars += len(prompt)
+            while self._chars > self.max_chars and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self._chars -= len(evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'prompts': len(self._items),
+                'chars': self._chars,
+                'max_chars': self.max_chars,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+PROMPT_CACHE = _PromptCache(PROMPT_CACHE_CHARS)
+
+class AgentSpec(Mapping):
+    """
+    Agent specification whose system prompt is loaded on first access.
+
+    Behaves like the spec dictionaries returned by parse_agent_spec, but
+    only the frontmatter fields live on the object. `spec['system_prompt']`
+    reads the body from disk and keeps it in the bounded PROMPT_CACHE, so
+    listing agents costs no body I/O or memory. The file must still hash to
+    content_hash; a spec whose file has been edited since it was loaded
+    raises StaleSpecError instead of returning a prompt from the new file.
+    """
+
+    __slots__ = ('file_path', 'content_hash', 'body_offset', 'frontmatter', '_fields')
+
+    def __init__(
+        self,
+        file_path: Path,
+        content_hash: str,
+        body_offset: int,
+        frontmatter: Dict[str, Any],
+        prompt_tokens: int = 0
+    ):
+        self.file_path = file_path
+        self.content_hash = content_hash
+        self.body_offset = body_offset
+        self.frontmatter = frontmatter
+        self._fields = {
+            'name': frontmatter.get('name'),
+            'title': frontmatter.get('title'),
+            'description': frontmatter.get('description'),
+            'enabled': frontmatter.get('enabled', True),
+            'prompt_tokens': prompt_tokens,
+            'profile': agent_profile(frontmatter)
+        }
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'system_prompt':
+            return self.system_prompt
+        return self._fields[key]
+
+    def __iter__(self):
+        yield from self._fields
+        yield 'system_prompt'
+
+    def __len__(self) -> int:
+        return len(self._fields) + 1
+
+    def __repr__(self) -> str:
+        return f"AgentSpec({self._fields['name']!r}, file={self.file_path.name!r})"
+
+    @property
+    def system_prompt(self) -> str:
+        key = (self.file_path, self.content_hash)
+        prompt = PROMPT_CACHE.get(key)
+        if prompt is None:
+            with open(self.file_path, 'rb') as f:
+                content = f.read()
+            # body_offset is only meaningful for the exact bytes that were scanned
+            if hashlib.sha256(content).hexdigest() != self.content_hash:
+                raise StaleSpecError(
+                    f"{self.file_path.name} changed on disk after it was loaded; retry with the current version"
+                )
+            prompt = _extract_system_prompt(content[self.body_offset:].decode('utf-8'))
+            PROMPT_CACHE.put(key, prompt)
+        return prompt
+
+    def prime(self, system_prompt: str) -> None:
+        """Seed the prompt cache (e.g. from the spec bundle) without disk I/O."""
+
+        PROMPT_CACHE.put((self.file_path, self.content_hash), system_prompt)
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+@dataclass
+class SpecEntry:
+    """Cached parse result for a single spec file."""
+
+    stat: Tuple[int, int]
+    content_hash: str
+    spec: Optional[Dict[str, Any]] = None
+    error: Optional[SpecError] = None
+    frontmatter: Optional[Dict[str, Any]] = None
+    token_count: int = 0
+
+def _stat_key(file_path: Path) -> Tuple[int, int]:
+    st = file_path.stat()
+    return (st.st_mtime_ns, st.st_size)
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """Immutable view of the enabled specs at one registry version."""
+
+    version: int
+    specs: Tuple[Dict[str, Any], ...] = ()
+    by_name: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.by_name.get(name)
+
+# Called with (old_snapshot, new_snapshot, names of added/changed/removed specs)
+RegistryListener = Callable[[RegistrySnapshot, RegistrySnapshot, Set[str]], None]
+
+def _changed_names(old: RegistrySnapshot, new: RegistrySnapshot) -> Set[str]:
+    names = set(old.by_name) | set(new.by_name)
+    return {name for name in names if old.by_name.get(name) is not new.by_name.get(name)}
+
+class AgentRegistry:
+    """
+    In-memory registry of agent specifications for one agents directory.
+
+    Specs are parsed once and kept until their file changes. Every refresh
+    stats the directory; a file is re-read only when its mtime or size
+    changed, and re-parsed only when its content hash changed. Changed files
+    are read and parsed on a bounded thread pool; results are applied in
+    file-name order, so the outcome does not depend on thread scheduling.
+
+    Readers work on immutable snapshots. A refresh builds a new snapshot and
+    swaps it in with a single assignment, so a request that grabbed a
+    snapshot keeps that version even if the registry changes underneath it.
+    While a watcher is running, readers never scan the directory.
+
+    With a bundle_path, the first refresh seeds the registry from the
+    precompiled bundle and only re-reads files whose mtime/size no longer
+    match it; the bundle is rewritten whenever anything changed.
+    """
+
+    def __init__(
+        self,
+        agents_dir: Path,
+        max_workers: Optional[int] = None,
+        verbose: bool = True,
+        bundle_path: Optional[Path] = None
+    ):
+        self.agents_dir = Path(agents_dir)
+        self.max_workers = max_workers or SPEC_PARSE_WORKERS
+        self.verbose = verbose
+        self.bundle_path = Path(bundle_path) if bundle_path else None
+        self._dirty = False
+        self._failures: Dict[str, SpecError] = {}
+        self._entries: Dict[Path, SpecEntry] = {}
+        self._snapshot = RegistrySnapshot(version=0)
+        self._listeners: List[RegistryListener] = []
+        self._watcher: Optional["AgentWatcher"] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def refresh(self) -> bool:
+        """
+        Bring the registry in line with the files on disk.
+
+        Returns:
+            True if the set of loaded specs changed (and the version was bumped)
+        """
+
+        with self._lock:
+            if self._snapshot.version == 0 and self.bundle_path is not None:
+                self._load_bundle()
+
+            if not self.agents_dir.exists():
+                print(f"Agents directory not found: {self.agents_dir}")
+                changed = bool(self._entries)
+                self._entries = {}
+            else:
+                changed = self._scan()
+
+            if self._dirty and self.bundle_path is not None:
+                self._write_bundle()
+
+            old = self._snapshot
+            if not changed and old.version > 0:
+                return False
+
+            specs = tuple(
+                entry.spec for _, entry in sorted(self._entries.items())
+                if entry.spec is not None and entry.spec['enabled']
+            )
+            by_name: Dict[str, Dict[str, Any]] = {}
+            for spec in specs:
+                by_name.setdefault(spec['name'], spec)
+            new = RegistrySnapshot(
+                version=old.version + 1,
+                specs=tuple(spec for spec in specs if by_name[spec['name']] is spec),
+                by_name=by_name
+            )
+            self._snapshot = new
+            listeners = list(self._listeners)
+
+        changed_names = _changed_names(old, new)
+        for listener in listeners:
+            try:
+                listener(old, new, changed_names)
+            except Exception as e:
+                print(f"✗ Registry listener failed: {e}")
+
+        return changed
+
+    def _scan(self) -> bool:
+        changed = False
+        seen = set()
+        pending = []
+
+        for file_path in sorted(self.agents_dir.glob('*.md')):
+            seen.add(file_path)
+            try:
+                stat = _stat_key(file_path)
+            except OSError:
+                continue
+
+            entry = self._entries.get(file_path)
+            if entry is None or entry.stat != stat:
+                pending.append((file_path, stat, entry))
+
+        # Read and parse changed files on a bounded pool; map() keeps file order
+        if len(pending) > 1 and self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as pool:
+                results = list(pool.map(self._load, pending))
+        else:
+            results = [self._load(item) for item in pending]
+
+        for (file_path, stat, entry), loaded in zip(pending, results):
+            self._dirty = True
+            if loaded is None:
+                # Touched but not modified - keep the parsed spec
+                entry.stat = stat
+                continue
+            self._entries[file_path] = loaded
+            if loaded.error is not None and loaded.content_hash:
+                self._failures[loaded.content_hash] = loaded.error
+            self._report(file_path, loaded)
+            changed = True
+
+        for file_path in list(self._entries):
+            if file_path not in seen:
+                del self._entries[file_path]
+                self._dirty = True
+                changed = True
+
+        # Only remember failures for content that is still on disk
+        live_hashes = {entry.content_hash for entry in self._entries.values()}
+        self._failures = {h: e for h, e in self._failures.items() if h in live_hashes}
+
+        return changed
+
+    def _load(self, item: Tuple[Path, Tuple[int, int], Optional[SpecEntry]]) -> Optional[SpecEntry]:
+        file_path, stat, entry = item
+
+        try:
+            content_hash, frontmatter_text, body_offset, token_count, error = scan_spec_file(file_path)
+        except (OSError, UnicodeDecodeError) as e:
+            error = SpecError(file_path.name, 'read_error', str(e))
+            return SpecEntry(stat=stat, content_hash='', error=error)
+
+        if entry is not None and entry.content_hash == content_hash:
+            return None
+
+        # Known-bad content (e.g. the same file renamed) is not parsed again
+        cached = self._failures.get(content_hash)
+        if cached is not None:
+            error = SpecError(file_path.name, cached.kind, cached.message, content_hash, cached.line)
+        if error is not None:
+            return SpecEntry(stat=stat, content_hash=content_hash, error=error)
+
+        try:
+            frontmatter = yaml.load(frontmatter_text, Loader=_YamlLoader)
+        except yaml.YAMLError as e:
+            mark = getattr(e, 'problem_mark', None)
+            error = SpecError(
+                file_path.name, 'yaml_error', f"Invalid YAML in {file_path}: {e}",
+                content_hash, mark.line + 2 if mark is not None else None
+            )
+        else:
+            error = validate_frontmatter(frontmatter, file_path)
+        if error is not None:
+            error.content_hash = content_hash
+            return SpecEntry(stat=stat, content_hash=content_hash, error=error)
+
+        return SpecEntry(
+            stat=stat,
+            content_hash=content_hash,
+            spec=AgentSpec(file_path, content_hash, body_offset, frontmatter, token_count),
+            frontmatter=frontmatter,
+            token_count=token_count
+        )
+
+    def _load_bundle(self) -> None:
+        """Seed the entries from the precompiled bundle (one read, no YAML)."""
+
+        try:
+            with open(self.bundle_path, 'rb') as f:
+                bundle = json.loads(f.read())
+        except FileNotFoundError:
+            self._dirty = True
+            return
+        except (OSError, ValueError) as e:
+            print(f"✗ Ignoring unreadable spec bundle {self.bundle_path}: {e}")
+            self._dirty = True
+            return
+
+        if bundle.get('format') != BUNDLE_FORMAT or bundle.get('tokenizer') != tokenizer_name():
+            self._dirty = True
+            return
+
+        for file_name, item in bundle['entries'].items():
+            file_path = self.agents_dir / file_name
+            entry = SpecEntry(
+                stat=tuple(item['stat']),
+                content_hash=item['content_hash'],
+                error=SpecError(**item['error']) if item.get('error') else None,
+                frontmatter=item.get('frontmatter'),
+                token_count=item.get('token_count', 0)
+            )
+            if entry.frontmatter is not None:
+                entry.spec = AgentSpec(
+                    file_path, entry.content_hash, item['body_offset'], entry.frontmatter, entry.token_count
+                )
+                if item.get('system_prompt') is not None:
+                    entry.spec.prime(item['system_prompt'])
+            self._entries[file_path] = entry
+            if entry.error is not None:
+                self._failures[entry.content_hash] = entry.error
+
+        if self.verbose:
+            print(f"✓ Loaded {len(self._entries)} agent spec(s) from bundle {self.bundle_path.name}")
+            if self._failures:
+                print(f"⚠ {len(self._failures)} spec(s) failed to load (see /api/agents/errors)")
+
+    def _bundled_prompts(self) -> Dict[Tuple[str, str], str]:
+        """Prompts stored in the current bundle file, by (file name, content hash)."""
+
+        try:
+            with open(self.bundle_path, 'rb') as f:
+                bundle = json.loads(f.read())
+        except (OSError, ValueError):
+            return {}
+        if bundle.get('format') != BUNDLE_FORMAT:
+            return {}
+        return {
+            (file_name, item['content_hash']): item['system_prompt']
+            for file_name, item in bundle['entries'].items()
+            if item.get('system_prompt') is not None
+        }
+
+    def _entry_prompt(self, file_path: Path, entry: SpecEntry, bundled: Dict[Tuple[str, str], str]) -> Optional[str]:
+        if entry.spec is None:
+            return None
+        prompt = bundled.get((file_path.name, entry.content_hash))
+        if prompt is not None:
+            return prompt
+        try:
+            return entry.spec.system_prompt
+        except (OSError, UnicodeDecodeError, StaleSpecError):
+            # Changed again since the scan; the next refresh picks it up
+            return None
+
+    def _write_bundle(self) -> None:
+        """
+        Write all parsed entries to the bundle file atomically.
+
+        Prompts of unchanged entries are carried over from the previous
+        bundle, so only specs that changed have their bodies read.
+        """
+
+        bundled = self._bundled_prompts()
+        bundle = {
+            'format': BUNDLE_FORMAT,
+            'tokenizer': tokenizer_name(),
+            'entries': {
+                file_path.name: {
+                    'stat': list(entry.stat),
+                    'content_hash': entry.content_hash,
+                    'frontmatter': entry.frontmatter,
+                    'body_offset': entry.spec.body_offset if entry.spec else None,
+                    'system_prompt': self._entry_prompt(file_path, entry, bundled),
+                    'token_count': entry.token_count,
+                    'error': entry.error.to_dict() if entry.error else None
+                }
+                for file_path, entry in sorted(self._entries.items())
+            }
+        }
+
+        try:
+            self.bundle_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.bundle_path.with_name(f"{self.bundle_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(bundle, default=str, separators=(',', ':')), encoding='utf-8')
+            os.replace(tmp_path, self.bundle_path)
+            self._dirty = False
+        except OSError as e:
+            print(f"✗ Could not write spec bundle {self.bundle_path}: {e}")
+
+    def _report(self, file_path: Path, entry: SpecEntry) -> None:
+        if not self.verbose:
+            return
+        if entry.error is not None:
+            print(f"✗ Failed to load {file_path.name}: {entry.error.message}")
+        elif entry.spec['enabled']:
+            print(f"✓ Loaded agent: {entry.spec['title']} ({entry.spec['name']}, {entry.token_count} tokens)")
+            if over_token_budget(entry.token_count):
+                print(f"⚠ {entry.spec['name']} system prompt exceeds the {PROMPT_TOKEN_BUDGET}-token budget")
+
+    def snapshot(self) -> RegistrySnapshot:
+        """
+        Get the current snapshot of enabled specs.
+
+        Without a running watcher the directory is checked for changes first;
+        with a watcher the current snapshot is returned as-is.
+
+        Returns:
+            The current RegistrySnapshot
+        """
+
+        if self._watcher is None or self._snapshot.version == 0:
+            self.refresh()
+        return self._snapshot
+
+    def specs(self) -> List[Dict[str, Any]]:
+        """
+        Get all enabled agent specifications.
+
+        Returns:
+            List of agent specification dictionaries (shared, treat as read-only)
+        """
+
+        return list(self.snapshot().specs)
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an enabled agent specification by name.
+
+        Args:
+            name: Agent identifier from the spec frontmatter
+
+        Returns:
+            The agent specification dictionary, or None if not found
+        """
+
+        return self.snapshot().get(name)
+
+    def errors(self) -> List[Dict[str, Any]]:
+        """
+        Report every spec that failed to load, plus duplicate agent names.
+
+        Failures are cached by content hash, so this never re-parses files.
+
+        Returns:
+            List of structured error dictionaries, ordered by file name
+        """
+
+        if self._snapshot.version == 0:
+            self.refresh()
+
+        with self._lock:
+            entries = sorted(self._entries.items())
+
+        errors = [entry.error.to_dict() for _, entry in entries if entry.error is not None]
+
+        owners: Dict[str, str] = {}
+        for file_path, entry in entries:
+            if entry.spec is None or not entry.spec['enabled']:
+                continue
+            name = entry.spec['name']
+            if name in owners:
+                errors.append(SpecError(
+                    file_path.name, 'duplicate_name',
+                    f"Agent name '{name}' is already defined in {owners[name]}; this spec is ignored",
+                    entry.content_hash
+                ).to_dict())
+            else:
+                owners[name] = file_path.name
+
+        return sorted(errors, key=lambda e: e['file'])
+
+    def subscribe(self, listener: RegistryListener) -> None:
+        """
+        Register a callback invoked after every snapshot swap.
+
+        Args:
+            listener: Called with (old_snapshot, new_snapshot, changed_names)
+        """
+
+        with self._lock:
+            self._listeners.append(listener)
+
+    def start_watching(self, poll_interval: float = 2.0) -> "AgentWatcher":
+        """
+        Start hot reloading the agents directory in the background.
+
+        Args:
+            poll_interval: Seconds between scans when watchdog is unavailable
+
+        Returns:
+            The running AgentWatcher
+        """
+
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = AgentWatcher(self, poll_interval)
+                self._watcher.start()
+            return self._watcher
+
+    def stop_watching(self) -> None:
+        """Stop the background watcher, if any."""
+
+        with self._lock:
+            watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Summary of the registry state for health/metrics endpoints."""
+
+        snapshot = self._snapshot
+        return {
+            'version': snapshot.version,
+            'files': len(self._entries),
+            'enabled_agents': len(snapshot.specs),
+            'failed_specs': len(self._failures),
+            'prompt_cache': PROMPT_CACHE.stats(),
+            'watcher': self._watcher.mode if self._watcher else None
+        }
+
+# ============================================================================
+# HOT RELOAD
+# ============================================================================
+
+class _ChangeHandler(FileSystemEventHandler):
+    """Forwards watchdog events for markdown files to the watcher."""
+
+    def __init__(self, watcher: "AgentWatcher"):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        paths = [getattr(event, 'src_path', ''), getattr(event, 'dest_path', '')]
+        if any(str(p).endswith('.md') for p in paths):
+            self.watcher.notify()
+
+class AgentWatcher:
+    """
+    Background watcher that keeps an AgentRegistry in sync with disk.
+
+    Uses inotify (through watchdog) when available and falls back to
+    polling the directory. Bursts of events (editors often write a file
+    several times) are debounced into a single refresh.
+    """
+
+    def __init__(self, registry: AgentRegistry, poll_interval: float = 2.0, debounce: float = 0.2):
+        self.registry = registry
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.mode = 'inotify' if Observer is not None else 'polling'
+        self._event = threading.Event()
+        self._stopped = threading.Event()
+        self._observer = None
+        self._thread = threading.Thread(target=self._run, name='agent-watcher', daemon=True)
+
+    def start(self) -> None:
+        if Observer is not None:
+            try:
+                self._observer = Observer()
+                self._observer.schedule(_ChangeHandler(self), str(self.registry.agents_dir))
+                self._observer.start()
+            except Exception as e:
+                print(f"✗ inotify watcher unavailable ({e}), polling instead")
+                self._observer = None
+                self.mode = 'polling'
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._event.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+        self._thread.join(timeout=5)
+
+    def notify(self) -> None:
+        self._event.set()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            timeout = None if self._observer is not None else self.poll_interval
+            self._event.wait(timeout)
+            if self._stopped.is_set():
+                break
+            if self._event.is_set():
+                time.sleep(self.debounce)
+                self._event.clear()
+            try:
+                if self.registry.refresh():
+                    print(f"↻ Reloaded agents (registry version {self.registry.version})")
+            except Exception as e:
+                print(f"✗ Agent reload failed: {e}")
+
+_registries: Dict[Path, AgentRegistry] = {}
+_registries_lock = threading.Lock()
+
+def get_registry(agents_dir: Optional[Path] = None) -> AgentRegistry:
+    """
+    Get the process-wide registry for an agents directory.
+
+    Args:
+        agents_dir: Path to the agents directory (defaults to ./agents)
+
+    Returns:
+        The shared AgentRegistry instance for that directory
+    """
+
+    key = Path(agents_dir or AGENTS_DIR).resolve()
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = AgentRegistry(key, bundle_path=bundle_path_for(key))
+        return registry
+
+def bundle_path_for(agents_dir: Path) -> Path:
+    """
+    Location of the precompiled spec bundle for an agents directory.
+
+    Args:
+        agents_dir: Path to the agents directory
+
+    Returns:
+        Path of the bundle file (AGENT_SPEC_BUNDLE overrides it for ./agents)
+    """
+
+    agents_dir = Path(agents_dir)
+    if agents_dir.resolve() == AGENTS_DIR.resolve() and os.getenv('AGENT_SPEC_BUNDLE'):
+        return Path(os.getenv('AGENT_SPEC_BUNDLE'))
+    return agents_dir.parent / ".cache" / f"{agents_dir.name}-specs.bundle.json"
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def lint(agents_dir: Path, as_json: bool = False) -> int:
+    """
+    Print a report of broken agent specs.
+
+    Args:
+        agents_dir: Path to the agents directory
+        as_json: Print the report as JSON instead of text
+
+    Returns:
+        Process exit code (1 if any spec has errors)
+    """
+
+    registry = AgentRegistry(agents_dir, verbose=False)
+    errors = registry.errors()
+
+    if as_json:
+        print(json.dumps({'errors': errors}, indent=2))
+    elif not errors:
+        print(f"✓ All {len(registry.snapshot().specs)} agent spec(s) are valid")
+    else:
+        for error in errors:
+            location = f"{error['file']}:{error['line']}" if error['line'] else error['file']
+            print(f"✗ {location} [{error['kind']}] {error['message']}")
+        print(f"\n{len(errors)} problem(s) found")
+
+    return 1 if errors else 0
+
+def main():
+    """Command line entry point: `python agent_registry.py bundle|lint`."""
+
+    parser = argparse.ArgumentParser(description="Agent spec registry tools")
+    parser.add_argument('command', choices=['bundle', 'lint'],
+                        help="bundle: precompile all specs into the bundle file; lint: report broken specs")
+    parser.add_argument('--agents-dir', type=Path, default=AGENTS_DIR, help="agents directory (default: ./agents)")
+    parser.add_argument('--json', action='store_true', help="lint: print the report as JSON")
+    args = parser.parse_args()
+
+    if args.command == 'lint':
+        sys.exit(lint(args.agents_dir, args.json))
+
+    if args.command == 'bundle':
+        bundle_path = bundle_path_for(args.agents_dir)
+        registry = AgentRegistry(args.agents_dir, bundle_path=None)
+        registry.refresh()
+        registry.bundle_path = bundle_path
+        registry._write_bundle()
+        print(f"✓ Wrote {len(registry._entries)} spec(s) to {bundle_path}")
+
+if __name__ == "__main__":
+    main()
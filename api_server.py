@@ -8,7 +8,10 @@ to interact with the Deep Agents system.
 import os
 import sys
 import time
+import queue
+import threading
 from pathlib import Path
+from concurrent.futures import Future
 from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import json
@@ -16,10 +19,18 @@ import json
 # Import Deep Agents configuration
 sys.path.append(str(Path(__file__).parent))
 from script import (
-    CONFIG, model, internet_search,
-    load_agent_specs, create_agent_from_spec,
-    create_main_orchestrator
+    CONFIG, model,
+    create_agent_from_spec,
+    create_main_orchestrator, warm_agent_pool, AGENT_POOL,
+    orchestrator_prompt_tokens, invoke_agent
 )
+from agent_registry import get_registry, over_token_budget, PROMPT_TOKEN_BUDGET
+from token_count import tokenizer_name
+from web_search import (
+    SEARCH_CACHE, SHARED_SEARCH_CACHE, SEARCH_FLIGHTS, SEARCH_RATE_LIMITER, SEARCH_BREAKER,
+    SEARCH_BACKEND, SEARCH_COMPACTION_STATS, RESEARCH_CORPUS, QUERY_INDEX, search_listener
+)
+from search_prefetch import SEARCH_PREFETCHER
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
@@ -35,27 +46,87 @@ def health_check():
         'status': 'healthy',
         'azure_endpoint': CONFIG['endpoint'],
         'deployment': CONFIG['deployment_name'],
-        'capacity': CONFIG['capacity']
+        'capacity': CONFIG['capacity'],
+        'agent_registry': get_registry().stats(),
+        'agent_pool': AGENT_POOL.stats(),
+        'search_cache': SEARCH_CACHE.stats(),
+        'shared_search_cache': SHARED_SEARCH_CACHE.stats() if SHARED_SEARCH_CACHE else None,
+        'search_near_duplicates': QUERY_INDEX.stats(),
+        'search_singleflight': SEARCH_FLIGHTS.stats(),
+        'search_rate_limit': SEARCH_RATE_LIMITER.stats(),
+        'search_circuit': SEARCH_BREAKER.stats(),
+        'search_backend': SEARCH_BACKEND.stats(),
+        'search_compaction': SEARCH_COMPACTION_STATS.stats(),
+        'research_corpus': RESEARCH_CORPUS.stats() if RESEARCH_CORPUS else None,
+        'search_prefetch': SEARCH_PREFETCHER.stats()
     })
 
 @app.route('/api/agents', methods=['GET'])
 def get_agents():
-    """Get list of available agents."""
+    """Get list of available agents with their system prompt token costs."""
     try:
-        agents_dir = Path(__file__).parent / "agents"
-        specs = load_agent_specs(agents_dir)
+        snapshot = get_registry().snapshot()
+        tpm = CONFIG['capacity'] * 1000
         
         agents = [{
             'name': spec['name'],
             'title': spec['title'],
             'description': spec['description'],
-            'enabled': spec['enabled']
-        } for spec in specs]
+            'enabled': spec['enabled'],
+            'prompt_tokens': spec['prompt_tokens'],
+            'over_budget': over_token_budget(spec['prompt_tokens']),
+            # Upper bound on LLM calls/min if each call only paid for the system prompt
+            'max_calls_per_minute': tpm // spec['prompt_tokens'] if spec['prompt_tokens'] else None,
+            'profile': spec['profile']
+        } for spec in snapshot.specs]
+        
+        orchestrator_tokens = orchestrator_prompt_tokens(snapshot)
         
-        return jsonify({'agents': agents})
+        return jsonify({
+            'agents': agents,
+            'version': snapshot.version,
+            'orchestrator': {
+                'prompt_tokens': orchestrator_tokens,
+                'over_budget': over_token_budget(orchestrator_tokens),
+                'max_calls_per_minute': tpm // orchestrator_tokens if orchestrator_tokens else None
+            },
+            'token_budget': PROMPT_TOKEN_BUDGET,
+            'tokenizer': tokenizer_name(),
+            'capacity_tpm': tpm
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/agents/errors', methods=['GET'])
+def get_agent_errors():
+    """Get agent specs that failed to load (cached, never re-parsed per request)."""
+    try:
+        registry = get_registry()
+        return jsonify({'errors': registry.errors(), 'version': registry.version})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def start_prefetch(message, spec=None):
+    """
+    Start speculative searches for a chat message before the agent runs.
+
+    Args:
+        message: User chat message
+        spec: Agent spec (None for the orchestrator's default search settings)
+
+    Returns:
+        Queries being prefetched
+    """
+    if spec:
+        queries = SEARCH_PREFETCHER.prefetch(
+            message, spec['profile']['search_max_results'], spec['profile']['search_type']
+        )
+    else:
+        queries = SEARCH_PREFETCHER.prefetch(message)
+    if queries:
+        print(f"🔎 Prefetching {len(queries)} search(es): {', '.join(queries)}")
+    return queries
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
     """
@@ -83,29 +154,34 @@ def chat():
         print(f"Selected Agent: {agent_name or 'orchestrator (auto)'}")
         print("="*70)
         
+        # Pin the registry version for the whole request
+        snapshot = get_registry().snapshot()
+        
         # Create agent (specific or orchestrator)
         if agent_name:
-            agents_dir = Path(__file__).parent / "agents"
-            specs = load_agent_specs(agents_dir)
-            spec = next((s for s in specs if s['name'] == agent_name), None)
+            spec = snapshot.get(agent_name)
             
             if not spec:
                 return jsonify({'error': f'Agent {agent_name} not found'}), 404
             
-            print(f"🤖 Creating {spec['title']}...")
+            start_prefetch(message, spec)
+            print(f"🤖 Loading {spec['title']}...")
             agent = create_agent_from_spec(spec)
+            timeout_seconds = spec['profile']['timeout_seconds']
         else:
-            print("🎯 Creating Main Orchestrator...")
-            agent = create_main_orchestrator()
+            start_prefetch(message)
+            print("🎯 Loading Main Orchestrator...")
+            agent = create_main_orchestrator(snapshot)
+            timeout_seconds = None
         
         print("💭 Agent is thinking...\n")
         
         # Invoke agent
-        result = agent.invoke({
-            "messages": [{"role": "user", "content": message}]
-        })
-        
-        response = result["messages"][-1].content
+        try:
+            response = invoke_agent(agent, message, timeout_seconds)
+        except TimeoutError as e:
+            print(f"\n⏱ TIMEOUT: {e}\n")
+            return jsonify({'error': str(e)}), 504
         
         print("\n" + "="*70)
         print("✅ Response Generated")
@@ -143,34 +219,56 @@ def chat_stream():
             yield f"data: {json.dumps({'type': 'status', 'message': 'Initializing agent...'})}\n\n"
             time.sleep(0.1)
             
+            # Pin the registry version for the whole request
+            snapshot = get_registry().snapshot()
+            
             # Create agent
             if agent_name:
-                agents_dir = Path(__file__).parent / "agents"
-                specs = load_agent_specs(agents_dir)
-                spec = next((s for s in specs if s['name'] == agent_name), None)
+                spec = snapshot.get(agent_name)
                 
                 if not spec:
                     error_msg = {'error': f'Agent {agent_name} not found'}
                     yield f"data: {json.dumps(error_msg)}\n\n"
                     return
                 
+                prefetched = start_prefetch(message, spec)
                 status_msg = {'type': 'status', 'message': f'Creating {spec["title"]}...'}
                 yield f"data: {json.dumps(status_msg)}\n\n"
                 agent = create_agent_from_spec(spec)
+                timeout_seconds = spec['profile']['timeout_seconds']
             else:
+                prefetched = start_prefetch(message)
                 status_msg = {'type': 'status', 'message': 'Creating orchestrator...'}
                 yield f"data: {json.dumps(status_msg)}\n\n"
-                agent = create_main_orchestrator()
+                agent = create_main_orchestrator(snapshot)
+                timeout_seconds = None
+            
+            if prefetched:
+                status_msg = {'type': 'status', 'message': f'Prefetching research: {", ".join(prefetched)}'}
+                yield f"data: {json.dumps(status_msg)}\n\n"
             
             status_msg = {'type': 'status', 'message': 'Agent is thinking and planning...'}
             yield f"data: {json.dumps(status_msg)}\n\n"
             
-            # Invoke agent
-            result = agent.invoke({
-                "messages": [{"role": "user", "content": message}]
-            })
+            # Run the agent in the background and forward its search hits as they arrive
+            hits = queue.Queue()
+            result = Future()
             
-            response = result["messages"][-1].content
+            def run():
+                with search_listener(hits.put):
+                    try:
+                        result.set_result(invoke_agent(agent, message, timeout_seconds))
+                    except BaseException as e:
+                        result.set_exception(e)
+            
+            threading.Thread(target=run, name='agent-stream', daemon=True).start()
+            while not result.done() or not hits.empty():
+                try:
+                    hit = hits.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                yield f"data: {json.dumps({'type': 'search_result', **hit})}\n\n"
+            response = result.result()
             
             # Send final response
             result_msg = {'type': 'response', 'response': response, 'agent_used': agent_name or 'orchestrator'}
@@ -217,4 +315,12 @@ if __name__ == '__main__':
     print(f"API Server: http://localhost:5001")
     print("=" * 70)
     
+    # Hot reload agent specs instead of rescanning /agents on every request
+    if os.getenv('AGENT_HOT_RELOAD', 'true').lower() != 'false':
+        watcher = get_registry().start_watching()
+        print(f"Watching agents/ for changes ({watcher.mode})")
+    
+    # Compile all agents up front so requests only borrow from the pool
+    warm_agent_pool()
+    
     app.run(debug=True, host='0.0.0.0', port=5001)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark DuckDuckGo client setup: a new DDGS per search vs pooled reuse.
+
+Reports the cost of constructing a client (no network) and, unless
+--offline is given, the latency of live searches made with a fresh client
+per query and with a client from the ClientPool used by web_search.py.
+
+Live searches hit DuckDuckGo; keep --queries small to avoid rate limiting.
+
+Usage:
+    python bench_search_clients.py [--queries 10] [--pause 1.0] [--offline]
+"""
+
+import argparse
+import statistics
+import time
+
+from duckduckgo_search import DDGS
+
+from search_clients import ClientPool
+
+QUERIES = [
+    "SaaS market size 2025",
+    "business intelligence software competitors",
+    "small business accounting software pricing",
+    "customer acquisition cost benchmarks B2B",
+    "startup funding trends seed round",
+]
+
+def time_construction(iterations: int) -> float:
+    """Return the mean seconds to construct one DDGS client."""
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        DDGS()
+    return (time.perf_counter() - start) / iterations
+
+def run_queries(search_with, count: int, pause: float) -> list:
+    """Run `count` searches with search_with(query) and return per-query seconds."""
+
+    timings = []
+    for i in range(count):
+        query = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        search_with(query)
+        timings.append(time.perf_counter() - start)
+        time.sleep(pause)
+    return timings
+
+def fresh_search(query: str) -> list:
+    with DDGS() as ddgs:
+        return list(ddgs.text(query, max_results=5))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queries', type=int, default=10, help='live searches per mode')
+    parser.add_argument('--pause', type=float, default=1.0, help='seconds between live searches')
+    parser.add_argument('--iterations', type=int, default=200, help='client constructions to time')
+    parser.add_argument('--offline', action='store_true', help='only time client construction')
+    args = parser.parse_args()
+
+    construction = time_construction(args.iterations)
+    print("=" * 70)
+    print(f"DDGS construction: {construction * 1000:.2f} ms per client ({args.iterations} iterations)")
+    print("=" * 70)
+
+    if args.offline:
+        return
+
+    pool = ClientPool(DDGS, max_idle=1)
+
+    def pooled_search(query: str) -> list:
+        with pool.client() as ddgs:
+            ddgs.sleep_timestamp = 0.0
+            return list(ddgs.text(query, max_results=5))
+
+    print(f"{'mode':<20}{'queries':>8}{'mean (s)':>12}{'median (s)':>12}{'first (s)':>12}")
+    print("=" * 70)
+    for label, search_with in (('new per call', fresh_search), ('pooled', pooled_search)):
+        try:
+            timings = run_queries(search_with, args.queries, args.pause)
+        except Exception as e:
+            print(f"{label:<20} ✗ search failed: {e}")
+            continue
+        print(f"{label:<20}{len(timings):>8}{statistics.mean(timings):>12.3f}"
+              f"{statistics.median(timings):>12.3f}{timings[0]:>12.3f}")
+    print("=" * 70)
+    print(f"Pool: {pool.stats()}")
+
+if __name__ == '__main__':
+    main()
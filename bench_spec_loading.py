@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark agent spec loading for large agent libraries.
+
+Generates synthetic agent specs in a temporary directory and reports cold
+(first parse) and warm (no changes, stat-only) load times for the
+AgentRegistry, sequentially, with the parallel parser and from a
+precompiled spec bundle.
+
+Usage:
+    python bench_spec_loading.py [--count 10000] [--workers 8]
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from agent_registry import AgentRegistry, SPEC_PARSE_WORKERS
+
+SPEC_TEMPLATE = """---
+name: synthetic-agent-{i:05d}
+title: Synthetic Agent {i}
+description: Business plan step {i} generated for load benchmarking
+enabled: true
+---
+
+# System Prompt
+
+You are a specialist for business plan step {i}.
+
+{body}
+"""
+
+BODY_LINE = "- Use internet_search to gather data, then provide a conservative, defensible estimate.\n"
+
+def generate_specs(target_dir: Path, count: int, body_lines: int) -> None:
+    """Write `count` synthetic spec files into target_dir."""
+
+    body = BODY_LINE * body_lines
+    for i in range(count):
+        (target_dir / f"synthetic-agent-{i:05d}.md").write_text(
+            SPEC_TEMPLATE.format(i=i, body=body), encoding='utf-8'
+        )
+
+def time_load(agents_dir: Path, workers: int, bundle_path: Path = None) -> tuple:
+    """Return (cold_seconds, warm_seconds, loaded_count) for one registry."""
+
+    registry = AgentRegistry(agents_dir, max_workers=workers, verbose=False, bundle_path=bundle_path)
+
+    start = time.perf_counter()
+    registry.refresh()
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    registry.refresh()
+    warm = time.perf_counter() - start
+
+    return cold, warm, len(registry.snapshot().specs)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=10000, help='number of synthetic specs')
+    parser.add_argument('--body-lines', type=int, default=40, help='prompt lines per spec')
+    parser.add_argument('--workers', type=int, default=SPEC_PARSE_WORKERS, help='parallel parser threads')
+    args = parser.parse_args()
+
+    agents_dir = Path(tempfile.mkdtemp(prefix='bench-agents-'))
+    try:
+        print(f"Generating {args.count} specs in {agents_dir}...")
+        generate_specs(agents_dir, args.count, args.body_lines)
+
+        print("=" * 70)
+        print(f"{'mode':<20}{'workers':>8}{'cold (s)':>12}{'warm (s)':>12}{'specs/s':>12}")
+        print("=" * 70)
+        for label, workers in (('sequential', 1), ('parallel', args.workers)):
+            cold, warm, loaded = time_load(agents_dir, workers)
+            assert loaded == args.count, f"loaded {loaded} of {args.count} specs"
+            print(f"{label:<20}{workers:>8}{cold:>12.3f}{warm:>12.3f}{args.count / cold:>12.0f}")
+
+        # First registry writes the bundle, the second cold-starts from it
+        bundle_path = agents_dir / ".bundle.json"
+        time_load(agents_dir, args.workers, bundle_path)
+        cold, warm, loaded = time_load(agents_dir, args.workers, bundle_path)
+        assert loaded == args.count, f"loaded {loaded} of {args.count} specs"
+        print(f"{'bundle':<20}{args.workers:>8}{cold:>12.3f}{warm:>12.3f}{args.count / cold:>12.0f}")
+        print("=" * 70)
+    finally:
+        shutil.rmtree(agents_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Circuit breaker for Business Plan Creator
+
+Stops calling a failing backend (DuckDuckGo) for a cool-down window instead
+of letting every agent spend its full retry budget on it.
+
+Outcomes are counted per call, not per attempt: a search that fails all of
+its retries is one failure, so a single bad query cannot open the breaker
+for everyone.
+
+States:
+- closed: calls go through; consecutive failures are counted
+- open: calls are rejected immediately until the cool-down has passed
+- half_open: a limited number of probe calls test recovery; a success
+  closes the breaker, a failure opens it for another cool-down
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+SEARCH_BREAKER_FAILURES = int(os.getenv('SEARCH_BREAKER_FAILURES', '5'))
+SEARCH_BREAKER_COOLDOWN = float(os.getenv('SEARCH_BREAKER_COOLDOWN', '60'))
+SEARCH_BREAKER_PROBES = int(os.getenv('SEARCH_BREAKER_PROBES', '1'))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker (thread-safe, per process).
+
+    Args:
+        failure_threshold: Consecutive failed calls that open the breaker (<= 0 disables it)
+        cooldown: Seconds to stay open before probing
+        probes: Concurrent probe calls allowed while half-open
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = SEARCH_BREAKER_FAILURES,
+        cooldown: float = SEARCH_BREAKER_COOLDOWN,
+        probes: int = SEARCH_BREAKER_PROBES
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.probes = max(probes, 1)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self.rejected = 0
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go to the backend.
+
+        Returns:
+            True if the call may proceed; callers must then report its
+            outcome with record_success(), record_failure() or cancel()
+        """
+
+        if self.failure_threshold <= 0:
+            return True
+
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    self.rejected += 1
+                    return False
+                self.state = HALF_OPEN
+                self._probes_in_flight = 0
+
+            if self.state == HALF_OPEN:
+                if self._probes_in_flight >= self.probes:
+                    self.rejected += 1
+                    return False
+                self._probes_in_flight += 1
+
+            return True
+
+    def record_success(self) -> None:
+        """Report a successful call; closes a half-open breaker."""
+
+        with self._lock:
+            if self.state != CLOSED:
+                print("✓ Search backend recovered, circuit closed")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self._probes_in_flight = 0
+
+    def record_failure(self) -> None:
+        """Report a failed call; opens the breaker at the threshold or on a failed probe."""
+
+        if self.failure_threshold <= 0:
+            return
+
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._probes_in_flight = 0
+                self.trips += 1
+                print(f"⚠ Search backend failing ({self.consecutive_failures} in a row), "
+                      f"circuit open for {self.cooldown:.0f}s")
+
+    def cancel(self) -> None:
+        """Report a call that ended without an outcome (e.g. cancelled); frees its probe slot."""
+
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes_in_flight > 0:
+                self._probes_in_flight -= 1
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker lets a probe through (0 otherwise)."""
+
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state and counters for health/metrics endpoints."""
+
+        retry_in = self.retry_in()
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'cooldown_seconds': self.cooldown,
+                'retry_in_seconds': round(retry_in, 1),
+                'trips': self.trips,
+                'rejected': self.rejected
+            }
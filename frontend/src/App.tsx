@@ -108,6 +108,17 @@ function App() {
             };
             return newMessages;
           });
+        } else if (data.type === 'search_result') {
+          // Show research hits as they arrive
+          setMessages(prev => {
+            const newMessages = [...prev];
+            newMessages[newMessages.length - 1] = {
+              role: 'assistant',
+              content: `🔎 ${data.query}: ${data.title}`,
+              agent: agentUsed
+            };
+            return newMessages;
+          });
         } else if (data.type === 'response') {
           finalResponse = data.response;
           agentUsed = data.agent_used;
@@ -0,0 +1,276 @@
+"""
+Query Canonicalization for Business Plan Creator
+
+LLM-written search queries vary in wording and word order, e.g.
+"top project management tools pricing 2026" and "project management
+software pricing top tools". Two layers let such queries share cached
+results:
+
+- canonical_query(): lowercase, drop punctuation and stopwords, strip
+  plural endings and sort the words, so reordered or re-punctuated
+  queries get the same cache key
+- NearDuplicateIndex: MinHash signatures over the canonical words with
+  LSH banding, so a query whose word set is similar enough (Jaccard >=
+  SEARCH_NEAR_DUP_THRESHOLD) to a cached one reuses its results. Lookups
+  touch a handful of hash buckets regardless of how many keys are indexed.
+  Similar is not enough on its own: the words that differ must all be
+  generic filler ("software", "tools", "latest"), so "series a funding"
+  never serves "series b funding" and "apple revenue" never serves
+  "apple revenue growth".
+
+Usage (behavior checks):
+    python query_canonical.py check
+"""
+
+import os
+import re
+import sys
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, FrozenSet, List, Optional, Set, Tuple
+
+# Minimum word-set Jaccard similarity for a near-duplicate hit (>= 1 disables)
+SEARCH_NEAR_DUP_THRESHOLD = float(os.getenv('SEARCH_NEAR_DUP_THRESHOLD', '0.65'))
+
+# Cache keys remembered by the near-duplicate index
+SEARCH_NEAR_DUP_MAX_KEYS = int(os.getenv('SEARCH_NEAR_DUP_MAX_KEYS', '20000'))
+
+# Only words that never distinguish one subject from another; short tokens
+# ("a" in "series a", "i" in "model i") and rank words ("top", "best") are kept
+_STOPWORDS = frozenset("""
+    an and are as at be by can do does for from how in is it its of on or
+    our should the their this to vs what when where which who why will with
+""".split())
+
+# Words a near-duplicate may add or drop (canonical, i.e. stemmed, forms):
+# they describe the kind of page wanted, not the subject searched for
+_FILLER_WORDS = frozenset("""
+    app company comparison compare current guide information latest list overview platform
+    product provider service software solution tool vendor
+""".split())
+
+_WORD = re.compile(r"[^\W_]+")
+
+# 32 hash functions in 16 bands of 2 rows: word sets with Jaccard ~0.5 and
+# above almost always share a band, and candidates are then checked exactly
+_NUM_PERM = 32
+_BANDS = 16
+_ROWS = _NUM_PERM // _BANDS
+
+# Universal hash permutations (a * h + b) mod p over one 61-bit hash per word
+_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), 'big') % (_PRIME - 1) + 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), 'big') % _PRIME)
+    for i in range(_NUM_PERM)
+]
+
+# Words whose plural-stripped form is a different common word ("news" is not "new")
+_NO_STEM = frozenset("""
+    canvas economics ethics goods graphics logistics means news physics politics windows
+""".split())
+
+def _stem(word: str) -> str:
+    if word in _NO_STEM:
+        return word
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+def query_words(query: str) -> List[str]:
+    """Canonical words of a query: lowercased, stemmed, without stopwords, sorted."""
+
+    words = [_stem(w) for w in _WORD.findall(query.lower())]
+    kept = [w for w in words if w not in _STOPWORDS] or words
+    return sorted(set(kept))
+
+def canonical_query(query: str) -> str:
+    """
+    Canonical form of a query for cache keys.
+
+    Args:
+        query: Search query string
+
+    Returns:
+        Space-joined canonical words (word order and stopwords no longer matter)
+    """
+
+    return ' '.join(query_words(query))
+
+def minhash(words: FrozenSet[str]) -> Tuple[int, ...]:
+    """MinHash signature of a word set."""
+
+    hashes = [int.from_bytes(hashlib.blake2b(w.encode(), digest_size=8).digest(), 'big') % _PRIME for w in words]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two word sets."""
+
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+def _numbers(words: FrozenSet[str]) -> FrozenSet[str]:
+    return frozenset(w for w in words if w.isdigit())
+
+class NearDuplicateIndex:
+    """
+    LSH index from cache keys to similar cached keys.
+
+    Keys are (canonical query, max_results, search_type). A match must have
+    the same search type, at least as many results, must differ only in
+    filler words, and must not name a different number (so "crm pricing
+    2025" never serves "crm pricing 2026").
+
+    Args:
+        threshold: Minimum Jaccard similarity of the canonical word sets
+        max_keys: Keys remembered (least recently added are forgotten)
+    """
+
+    def __init__(self, threshold: float = SEARCH_NEAR_DUP_THRESHOLD, max_keys: int = SEARCH_NEAR_DUP_MAX_KEYS):
+        self.threshold = threshold
+        self.max_keys = max_keys
+        self._keys: "OrderedDict[Tuple[str, int, str], Tuple[FrozenSet[str], Tuple[int, ...]]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, str, Tuple[int, ...]], Set[Tuple[str, int, str]]] = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.lookup_seconds = 0.0
+
+    def _bands(self, search_type: str, signature: Tuple[int, ...]):
+        for band in range(_BANDS):
+            yield band, search_type, signature[band * _ROWS:(band + 1) * _ROWS]
+
+    def add(self, key: Tuple[str, int, str]) -> None:
+        """Remember a cached key."""
+
+        if self.threshold >= 1:
+            return
+        words = frozenset(key[0].split())
+        if not words:
+            return
+        signature = minhash(words)
+
+        with self._lock:
+            if key in self._keys:
+                self._keys.move_to_end(key)
+                return
+            self._keys[key] = (words, signature)
+            for bucket in self._bands(key[2], signature):
+                self._buckets.setdefault(bucket, set()).add(key)
+            while len(self._keys) > self.max_keys:
+                self._discard(next(iter(self._keys)))
+
+    def discard(self, key: Tuple[str, int, str]) -> None:
+        """Forget a key (e.g. after its cache entry turned out to be gone)."""
+
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: Tuple[str, int, str]) -> None:
+        entry = self._keys.pop(key, None)
+        if entry is None:
+            return
+        for bucket in self._bands(key[2], entry[1]):
+            members = self._buckets.get(bucket)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._buckets[bucket]
+
+    def find(self, key: Tuple[str, int, str]) -> Optional[Tuple[str, int, str]]:
+        """
+        Find the most similar remembered key for a cache miss.
+
+        Args:
+            key: Cache key that missed
+
+        Returns:
+            The best matching key above the threshold, or None
+        """
+
+        if self.threshold >= 1:
+            return None
+        words = frozenset(key[0].split())
+        if not words:
+            return None
+
+        start = time.perf_counter()
+        signature = minhash(words)
+        numbers = _numbers(words)
+        best, best_score = None, self.threshold
+
+        with self._lock:
+            self.lookups += 1
+            candidates = set()
+            for bucket in self._bands(key[2], signature):
+                candidates |= self._buckets.get(bucket, set())
+            for candidate in candidates:
+                if candidate == key or candidate[1] < key[1]:
+                    continue
+                candidate_words = self._keys[candidate][0]
+                candidate_numbers = _numbers(candidate_words)
+                if numbers and candidate_numbers and numbers != candidate_numbers:
+                    continue
+                # Any differing subject word (entity, metric, qualifier) rules the candidate out
+                if any(not w.isdigit() and w not in _FILLER_WORDS for w in words ^ candidate_words):
+                    continue
+                score = jaccard(words, candidate_words)
+                if score >= best_score:
+                    best, best_score = candidate, score
+            if best is not None:
+                self.hits += 1
+            self.lookup_seconds += time.perf_counter() - start
+
+        return best
+
+    def stats(self) -> Dict[str, Any]:
+        """Index counters for health/metrics endpoints."""
+
+        with self._lock:
+            return {
+                'keys': len(self._keys),
+                'threshold': self.threshold,
+                'lookups': self.lookups,
+                'hits': self.hits,
+                'avg_lookup_us': round(self.lookup_seconds / self.lookups * 1e6, 1) if self.lookups else None
+            }
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+# (cached query, new query, whether the cached results may be served)
+_CHECKS = [
+    ("top project management tools pricing 2026", "project management software pricing top tools", True),
+    ("CRM software pricing", "crm pricing", True),
+    ("latest saas churn benchmarks", "saas churn benchmarks", True),
+    ("series a funding", "series b funding", False),
+    ("Looker Power BI Tableau pricing comparison", "Tableau Power BI Qlik pricing comparison", False),
+    ("apple revenue", "apple revenue growth", False),
+    ("crm pricing 2025", "crm pricing 2026", False),
+    ("best crm tools", "crm tools", False),
+    ("new apple products", "apple products news", False),
+]
+
+def main():
+    """Command line entry point: check near-duplicate decisions on known query pairs."""
+
+    if sys.argv[1:] != ['check']:
+        print("Usage: python query_canonical.py check")
+        sys.exit(2)
+
+    failures = 0
+    for cached, query, expected in _CHECKS:
+        index = NearDuplicateIndex(threshold=SEARCH_NEAR_DUP_THRESHOLD)
+        index.add((canonical_query(cached), 5, 'general'))
+        served = index.find((canonical_query(query), 5, 'general')) is not None
+        ok = served == expected
+        failures += not ok
+        print(f"{'✓' if ok else '✗'} {query!r} {'served from' if served else 'not served from'} {cached!r}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Token-bucket rate limiter for Business Plan Creator
+
+Spaces out DuckDuckGo requests so concurrent agents queue for a slot
+instead of all failing together and retrying in lockstep.
+
+The bucket refills at SEARCH_RATE_LIMIT_QPS tokens per second up to
+SEARCH_RATE_LIMIT_BURST. Each caller reserves a token and sleeps until its
+slot comes up, so waiters are served in order without polling. With a state
+file (the default) the bucket lives in a small flock-protected file and is
+shared by every worker process on the host.
+"""
+
+import asyncio
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: the bucket is per process
+    fcntl = None
+
+SEARCH_RATE_LIMIT_QPS = float(os.getenv('SEARCH_RATE_LIMIT_QPS', '1'))
+SEARCH_RATE_LIMIT_BURST = float(os.getenv('SEARCH_RATE_LIMIT_BURST', '3'))
+
+# Shared bucket state; set SEARCH_RATE_LIMIT_STATE=off for a per-process bucket
+SEARCH_RATE_LIMIT_STATE = os.getenv(
+    'SEARCH_RATE_LIMIT_STATE', str(Path(__file__).parent / ".cache" / "search_ratelimit.state")
+)
+
+# (tokens, last refill wall-clock time)
+_STATE = struct.Struct('dd')
+
+class TokenBucket:
+    """
+    Token bucket shared by threads and, with a state file, by processes.
+
+    Args:
+        rate: Tokens added per second (<= 0 disables limiting)
+        burst: Bucket capacity
+        state_path: File holding the shared bucket state (None for per process)
+    """
+
+    def __init__(self, rate: float, burst: float, state_path: Optional[str] = None):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.state_path = Path(state_path) if state_path and fcntl is not None else None
+        self._tokens = self.burst
+        self._updated = time.time()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.waited = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _take(self, tokens: float, updated: float) -> Tuple[float, float, float]:
+        """Refill, take one token and return (tokens, updated, wait_seconds)."""
+
+        now = time.time()
+        tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate) - 1.0
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        return tokens, now, wait
+
+    def _reserve_shared(self) -> float:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.state_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            # Held only for a read-modify-write of 16 bytes
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            data = os.pread(fd, _STATE.size, 0)
+            if len(data) == _STATE.size:
+                tokens, updated = _STATE.unpack(data)
+            else:
+                tokens, updated = self.burst, time.time()
+            tokens, updated, wait = self._take(tokens, updated)
+            os.pwrite(fd, _STATE.pack(tokens, updated), 0)
+            return wait
+        finally:
+            os.close(fd)
+
+    def reserve(self) -> float:
+        """
+        Reserve the next slot.
+
+        Returns:
+            Seconds the caller must wait before using its slot
+        """
+
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            if self.state_path is not None:
+                try:
+                    wait = self._reserve_shared()
+                except OSError as e:
+                    print(f"⚠ Rate limiter state file unusable, limiting per process: {e}")
+                    self.state_path = None
+            if self.state_path is None:
+                self._tokens, self._updated, wait = self._take(self._tokens, self._updated)
+
+            self.acquired += 1
+            if wait > 0:
+                self.waited += 1
+                self.wait_seconds_total += wait
+                self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            return wait
+
+    def _peek_shared(self) -> Tuple[float, float]:
+        fd = os.open(self.state_path, os.O_RDONLY)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            data = os.pread(fd, _STATE.size, 0)
+        finally:
+            os.close(fd)
+        if len(data) != _STATE.size:
+            return self.burst, time.time()
+        return _STATE.unpack(data)
+
+    def available(self) -> float:
+        """
+        Tokens that could be taken right now without waiting.
+
+        Reads the bucket without reserving anything, so optional callers
+        (e.g. speculative prefetch) can stay out of the queue when it is busy.
+
+        Returns:
+            Current token count (infinite when limiting is disabled)
+        """
+
+        if self.rate <= 0:
+            return float('inf')
+
+        with self._lock:
+            tokens, updated = self._tokens, self._updated
+            if self.state_path is not None:
+                try:
+                    tokens, updated = self._peek_shared()
+                except FileNotFoundError:
+                    tokens, updated = self.burst, time.time()
+                except OSError:
+                    pass
+            return min(self.burst, tokens + max(0.0, time.time() - updated) * self.rate)
+
+    async def acquire(self) -> float:
+        """Wait on the event loop for a slot; returns the seconds waited."""
+
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        """Limiter settings and wait-time counters for health/metrics endpoints."""
+
+        with self._lock:
+            return {
+                'qps': self.rate,
+                'burst': self.burst,
+                'shared': self.state_path is not None,
+                'acquired': self.acquired,
+                'waited': self.waited,
+                'wait_seconds_total': round(self.wait_seconds_total, 3),
+                'wait_seconds_avg': round(self.wait_seconds_total / self.acquired, 3) if self.acquired else None,
+                'wait_seconds_max': round(self.wait_seconds_max, 3)
+            }
+
+def open_search_limiter() -> TokenBucket:
+    """DuckDuckGo limiter configured by the SEARCH_RATE_LIMIT_* variables."""
+
+    state = SEARCH_RATE_LIMIT_STATE
+    if state.lower() in ('', 'off', 'none', 'false'):
+        state = None
+    return TokenBucket(SEARCH_RATE_LIMIT_QPS, SEARCH_RATE_LIMIT_BURST, state)
@@ -0,0 +1,276 @@
+"""
+Local Research Corpus for Business Plan Creator
+
+Keeps every search result ever fetched in a local full-text index so later
+runs can answer repeat topics without going to the web, and so research
+keeps working offline.
+
+Results are stored in a SQLite file with an FTS5 inverted index over title
+and snippet. The index is updated incrementally as results arrive and is
+ranked with BM25 (titles weighted higher than snippets). A lookup is
+considered relevant when enough hits contain most of the query's terms;
+otherwise callers fall back to a web search.
+
+Usage (maintenance):
+    python research_corpus.py stats
+    python research_corpus.py search "saas churn benchmarks"
+    python research_corpus.py import-cache    # backfill from the shared search cache
+"""
+
+import os
+import re
+import sys
+import json
+import sqlite3
+import argparse
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+# Corpus file; set RESEARCH_CORPUS_DB=off to disable it
+RESEARCH_CORPUS_DB = os.getenv(
+    'RESEARCH_CORPUS_DB', str(Path(__file__).parent / ".cache" / "research_corpus.sqlite3")
+)
+
+# A local answer needs this many hits covering this share of the query terms
+RESEARCH_MIN_HITS = int(os.getenv('RESEARCH_MIN_HITS', '3'))
+RESEARCH_MIN_COVERAGE = float(os.getenv('RESEARCH_MIN_COVERAGE', '0.75'))
+
+# Oldest results used for a local answer, per search type (seconds)
+RESEARCH_MAX_AGE = {
+    'general': float(os.getenv('RESEARCH_MAX_AGE_GENERAL', str(90 * 86400))),
+    'news': float(os.getenv('RESEARCH_MAX_AGE_NEWS', '86400'))
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,
+    search_type TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, body, content='documents', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    INSERT INTO documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+END;
+"""
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or the to what which who why with vs".split()
+)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+def query_terms(query: str) -> List[str]:
+    """Lowercased query words without stopwords (all words if only stopwords)."""
+
+    words = _WORD.findall(query.lower())
+    terms = [w for w in words if w not in _STOPWORDS]
+    return list(dict.fromkeys(terms or words))
+
+def _coverage(terms: List[str], text: str) -> float:
+    words = set(_WORD.findall(text.lower()))
+    # Prefix match so "benchmarks" covers "benchmark", roughly as the porter index does
+    matched = sum(1 for t in terms if t in words or any(w.startswith(t[:5]) for w in words if len(t) > 5))
+    return matched / len(terms) if terms else 0.0
+
+class ResearchCorpus:
+    """
+    BM25-ranked store of past search results.
+
+    Args:
+        path: SQLite file for the corpus
+    """
+
+    def __init__(self, path: str = RESEARCH_CORPUS_DB):
+        self.path = Path(path)
+        self.added = 0
+        self.lookups = 0
+        self.local_answers = 0
+        self.errors = 0
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def add(self, results: List[Dict[str, Any]], search_type: str = "general") -> int:
+        """
+        Index search results (re-fetched URLs are updated in place).
+
+        Args:
+            results: Raw result dictionaries
+            search_type: Search type the results came from
+
+        Returns:
+            Number of results indexed
+        """
+
+        rows = []
+        now = time.time()
+        for r in results:
+            url = r.get('href', r.get('url', '')).strip().rstrip('/')
+            title = r.get('title', '')
+            if url and title:
+                rows.append((url, title, r.get('body', r.get('description', '')), search_type, now))
+        if not rows:
+            return 0
+
+        try:
+            conn = self._connect()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany(
+                    'INSERT INTO documents (url, title, body, search_type, fetched_at) VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT(url) DO UPDATE SET title = excluded.title, body = excluded.body, '
+                    'search_type = excluded.search_type, fetched_at = excluded.fetched_at',
+                    rows
+                )
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+            return 0
+
+        self.added += len(rows)
+        return len(rows)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        search_type: str = "general"
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Find past results for a query.
+
+        Args:
+            query: Search query string
+            limit: Maximum number of results to return
+            search_type: Only results of this type (and age) are considered
+
+        Returns:
+            Tuple of (raw result dictionaries ranked by BM25, whether they
+            are relevant enough to answer without a web search)
+        """
+
+        terms = query_terms(query)
+        if not terms:
+            return [], False
+
+        # Quote every term so user text can never be read as FTS5 syntax
+        match = ' OR '.join('"' + t.replace('"', '') + '"' for t in terms)
+        max_age = RESEARCH_MAX_AGE.get(search_type, RESEARCH_MAX_AGE['general'])
+        self.lookups += 1
+        try:
+            rows = self._connect().execute(
+                'SELECT d.url, d.title, d.body, bm25(documents_fts, 2.0, 1.0) AS score '
+                'FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid '
+                'WHERE documents_fts MATCH ? AND d.search_type = ? AND d.fetched_at > ? '
+                'ORDER BY score LIMIT ?',
+                (match, search_type, time.time() - max_age, limit)
+            ).fetchall()
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+            return [], False
+
+        results = [{'title': title, 'href': url, 'body': body} for url, title, body, _ in rows]
+        covered = sum(1 for r in results if _coverage(terms, r['title'] + ' ' + r['body']) >= RESEARCH_MIN_COVERAGE)
+        relevant = covered >= min(RESEARCH_MIN_HITS, limit)
+        if relevant:
+            self.local_answers += 1
+        return results, relevant
+
+    def stats(self) -> Dict[str, Any]:
+        """Corpus counters for health/metrics endpoints."""
+
+        stats = {
+            'path': str(self.path),
+            'added': self.added,
+            'lookups': self.lookups,
+            'local_answers': self.local_answers,
+            'errors': self.errors
+        }
+        try:
+            stats['documents'] = self._connect().execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+        return stats
+
+def open_research_corpus() -> Optional[ResearchCorpus]:
+    """Corpus configured by RESEARCH_CORPUS_DB (None if disabled or FTS5 is missing)."""
+
+    if RESEARCH_CORPUS_DB.lower() in ('', 'off', 'none', 'false'):
+        return None
+    try:
+        sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE t USING fts5(x)')
+    except sqlite3.Error:
+        print("⚠ SQLite was built without FTS5, local research corpus disabled")
+        return None
+    return ResearchCorpus(RESEARCH_CORPUS_DB)
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main():
+    """Command line entry point for inspecting and backfilling the corpus."""
+
+    parser = argparse.ArgumentParser(description="Local research corpus maintenance")
+    parser.add_argument('command', choices=['stats', 'search', 'import-cache'])
+    parser.add_argument('query', nargs='?', help='query for the search command')
+    parser.add_argument('--type', default='general', choices=['general', 'news'], help='search type')
+    parser.add_argument('--limit', type=int, default=10, help='results to show')
+    args = parser.parse_args()
+
+    corpus = open_research_corpus()
+    if corpus is None:
+        print("Local research corpus is disabled (RESEARCH_CORPUS_DB=off or no FTS5)")
+        sys.exit(1)
+
+    if args.command == 'search':
+        if not args.query:
+            parser.error("search needs a query")
+        results, relevant = corpus.search(args.query, args.limit, args.type)
+        for i, r in enumerate(results, 1):
+            print(f"{i}. {r['title']}\n   {r['href']}")
+        print(f"{'✓' if relevant else '⚠'} {'relevant' if relevant else 'low relevance'} "
+              f"({len(results)} result(s))")
+        return
+
+    if args.command == 'import-cache':
+        from search_cache import open_shared_cache
+        cache = open_shared_cache()
+        if cache is None:
+            print("Shared search cache is disabled (SEARCH_CACHE_DB=off)")
+            sys.exit(1)
+        imported = 0
+        for (_, _, search_type), results in cache.entries():
+            imported += corpus.add(results, search_type)
+        print(f"✓ Indexed {imported} result(s) from {cache.path}")
+
+    print(json.dumps(corpus.stats(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -14,18 +14,23 @@ Features:
 
 import os
 import sys
-import time
-import yaml
+import asyncio
+import threading
 from pathlib import Path
-from typing import Literal, Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
 from dotenv import load_dotenv
 from azure.identity import DefaultAzureCredential
-from duckduckgo_search import DDGS
 from deepagents import create_deep_agent
+from langchain.agents.middleware import ToolCallLimitMiddleware
 from langchain_openai import AzureChatOpenAI
 
+from agent_pool import AgentPool
+from web_search import make_search_tools
+from agent_registry import parse_agent_spec, get_registry, RegistrySnapshot, DEFAULT_PROFILE
+from token_count import count_tokens
+
 # ============================================================================
 # ENVIRONMENT & CONFIGURATION
 # ============================================================================
@@ -88,115 +93,54 @@ model = AzureChatOpenAI(
     azure_ad_token_provider=lambda: credential.get_token("https://cognitiveservices.azure.com/.default").token
 )
 
-# ============================================================================
-# DUCKDUCKGO SEARCH WITH PROGRESSIVE BACKOFF
-# ============================================================================
+# Per-agent model variants (deployment, max_tokens, timeout), created on demand
+_models: Dict[Tuple[Optional[str], Optional[int], Optional[float]], AzureChatOpenAI] = {}
+_models_lock = threading.Lock()
 
-def internet_search(
-    query: str,
-    max_results: int = 5,
-    search_type: Literal["general", "news"] = "general"
-) -> str:
+def get_model(
+    deployment: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    timeout: Optional[float] = None
+) -> AzureChatOpenAI:
     """
-    Search the internet using DuckDuckGo with progressive backoff (up to 60s).
+    Get the chat model for an agent profile.
     
     Args:
-        query: Search query string
-        max_results: Maximum number of results to return
-        search_type: Type of search ("general" or "news")
+        deployment: Azure OpenAI deployment name (None = default deployment)
+        max_tokens: Completion token cap per call (None = no cap)
+        timeout: Per-request timeout in seconds (None = client default)
         
     Returns:
-        Formatted string with search results
+        Shared AzureChatOpenAI instance for that combination
     """
     
-    max_retries = 5
-    initial_backoff = 1.0
-    backoff = initial_backoff
-    max_backoff = 60.0
-    
-    for attempt in range(max_retries):
-        try:
-            with DDGS() as ddgs:
-                if search_type == "news":
-                    raw_results = list(ddgs.news(query, max_results=max_results))
-                else:
-                    raw_results = list(ddgs.text(query, max_results=max_results))
-            
-            if not raw_results:
-                return "No results found for this query."
-            
-            # Format results
-            results = []
-            for i, r in enumerate(raw_results, 1):
-                title = r.get('title', '')
-                url = r.get('href', r.get('url', ''))
-                snippet = r.get('body', r.get('description', ''))
-                
-                if title and url:
-                    results.append(f"{i}. **{title}**\n   URL: {url}\n   {snippet}\n")
-            
-            if not results:
-                return "No valid results found after quality filtering."
-            
-            return "\n".join(results)
-            
-        except Exception as e:
-            if attempt < max_retries - 1:
-                sleep_time = min(backoff, max_backoff)
-                time.sleep(sleep_time)
-                backoff *= 2
-            else:
-                return f"Error: Could not complete search after {max_retries} attempts."
-    
-    return "Search failed after all retries."
+    if deployment in (None, CONFIG['deployment_name']) and max_tokens is None and timeout is None:
+        return model
+    
+    key = (deployment, max_tokens, timeout)
+    with _models_lock:
+        if key not in _models:
+            _models[key] = AzureChatOpenAI(
+                azure_deployment=deployment or CONFIG['deployment_name'],
+                api_version=CONFIG['api_version'],
+                azure_endpoint=CONFIG['endpoint'],
+                azure_ad_token_provider=model.azure_ad_token_provider,
+                max_tokens=max_tokens,
+                timeout=timeout
+            )
+        return _models[key]
 
 # ============================================================================
 # DYNAMIC AGENT LOADING
 # ============================================================================
 
-def parse_agent_spec(file_path: Path) -> Dict[str, Any]:
-    """
-    Parse agent specification from markdown file with YAML frontmatter.
-    
-    Args:
-        file_path: Path to the agent specification markdown file
-        
-    Returns:
-        Dictionary containing agent metadata and system prompt
-    """
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Split frontmatter and body
-    if content.startswith('---'):
-        parts = content.split('---', 2)
-        if len(parts) >= 3:
-            frontmatter = yaml.safe_load(parts[1])
-            body = parts[2].strip()
-        else:
-            raise ValueError(f"Invalid frontmatter in {file_path}")
-    else:
-        raise ValueError(f"No frontmatter found in {file_path}")
-    
-    # Extract system prompt from markdown body
-    # Remove the "# System Prompt" header if present
-    system_prompt = body
-    if system_prompt.startswith('# System Prompt'):
-        system_prompt = '\n'.join(system_prompt.split('\n')[1:]).strip()
-    
-    return {
-        'name': frontmatter.get('name'),
-        'title': frontmatter.get('title'),
-        'description': frontmatter.get('description'),
-        'enabled': frontmatter.get('enabled', True),
-        'system_prompt': system_prompt
-    }
-
 def load_agent_specs(agents_dir: Path) -> List[Dict[str, Any]]:
     """
     Load all agent specifications from markdown files in the agents directory.
     
+    Specs are served from the process-wide AgentRegistry, so files are only
+    re-read and re-parsed when they change on disk.
+    
     Args:
         agents_dir: Path to the agents directory
         
@@ -204,27 +148,36 @@ def load_agent_specs(agents_dir: Path) -> List[Dict[str, Any]]:
         List of agent specification dictionaries
     """
     
-    specs = []
+    return get_registry(agents_dir).specs()
+
+def build_deep_agent(system_prompt: str, tools: List[Any], profile: Optional[Dict[str, Any]] = None) -> Any:
+    """Compile a new Deep Agent (used by the agent pool on a miss)."""
     
-    if not agents_dir.exists():
-        print(f"Agents directory not found: {agents_dir}")
-        return specs
+    profile = profile or DEFAULT_PROFILE
     
-    for file_path in agents_dir.glob('*.md'):
-        try:
-            spec = parse_agent_spec(file_path)
-            if spec['enabled']:
-                specs.append(spec)
-                print(f"✓ Loaded agent: {spec['title']} ({spec['name']})")
-        except Exception as e:
-            print(f"✗ Failed to load {file_path.name}: {e}")
+    middleware = []
+    if profile['tool_call_limit']:
+        middleware.append(ToolCallLimitMiddleware(run_limit=profile['tool_call_limit']))
     
-    return specs
+    return create_deep_agent(
+        tools=tools,
+        system_prompt=system_prompt,
+        model=get_model(profile['deployment'], profile['max_tokens'], profile['timeout_seconds']),
+        middleware=middleware
+    )
+
+# Compiled agents reused across requests, keyed by system prompt + tools + profile
+AGENT_POOL = AgentPool(build_deep_agent)
 
 def create_agent_from_spec(spec: Dict[str, Any]) -> Any:
     """
     Create a Deep Agent from an agent specification.
     
+    The agent is borrowed from AGENT_POOL and only compiled when no agent
+    with the same system prompt, tools and profile has been built yet. The
+    spec's profile selects the model deployment, max_tokens, search defaults
+    and tool-call limit (see agent_registry.agent_profile).
+    
     Args:
         spec: Agent specification dictionary
         
@@ -232,13 +185,43 @@ def create_agent_from_spec(spec: Dict[str, Any]) -> Any:
         Configured Deep Agent instance
     """
     
-    agent = create_deep_agent(
-        tools=[internet_search],
-        system_prompt=spec['system_prompt'],
-        model=model
+    profile = spec.get('profile') or DEFAULT_PROFILE
+    tools = make_search_tools(
+        profile['search_max_results'], profile['search_type'], profile['search_token_budget']
     )
     
-    return agent
+    return AGENT_POOL.get(spec['name'], spec['system_prompt'], tools, profile)
+
+def invoke_agent(agent: Any, message: str, timeout_seconds: Optional[float] = None) -> str:
+    """
+    Run an agent on a user message and return its final answer.
+    
+    Args:
+        agent: Compiled Deep Agent
+        message: User message
+        timeout_seconds: Wall-clock limit for the whole run (None = no limit)
+        
+    Returns:
+        Content of the agent's last message
+        
+    Raises:
+        TimeoutError: If the run does not finish within timeout_seconds
+    """
+    
+    payload = {"messages": [{"role": "user", "content": message}]}
+    
+    # Always run on ainvoke: search tools are awaited, so a retrying search
+    # holds no thread, and a deadline cancels the run itself instead of
+    # leaving model and search calls running on after the timeout
+    run = agent.ainvoke(payload)
+    if timeout_seconds:
+        run = asyncio.wait_for(run, timeout_seconds)
+    try:
+        result = asyncio.run(run)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Agent run exceeded {timeout_seconds:g}s")
+    
+    return result["messages"][-1].content
 
 def get_available_agents() -> Dict[str, Any]:
     """
@@ -269,23 +252,9 @@ def get_available_agents() -> Dict[str, Any]:
 # MAIN ORCHESTRATOR AGENT
 # ============================================================================
 
-def create_main_orchestrator():
-    """
-    Create the main Deep Agent orchestrator.
-    
-    This agent analyzes incoming tasks and uses available tools to complete them.
-    """
-    
-    # Get list of available agents for the system prompt
-    agents_dir = Path(__file__).parent / "agents"
-    specs = load_agent_specs(agents_dir)
-    
-    agent_descriptions = "\n".join([
-        f"- **{spec['title']}**: {spec['description']}"
-        for spec in specs
-    ])
-    
-    system_prompt = f"""You are an Expert Business Planning Orchestrator AI assistant that helps with business planning, research, and analysis.
+ORCHESTRATOR_NAME = "orchestrator"
+
+ORCHESTRATOR_PROMPT_TEMPLATE = """You are an Expert Business Planning Orchestrator AI assistant that helps with business planning, research, and analysis.
 
 You are working on a business planning project focused on customer acquisition and competitive strategy.
 
@@ -300,20 +269,123 @@ You are working on a business planning project focused on customer acquisition a
 
 **Guidelines:**
 1. Break down complex tasks into manageable steps
-2. Use internet_search extensively to gather current, relevant information
+2. Use internet_search extensively to gather current, relevant information; use internet_search_many to research several subjects (e.g. competitors) in one step, and search_type="both" for market trends that need background and recent news together
 3. Store large amounts of information in files to manage context
 4. Provide comprehensive, actionable insights
 5. Support all recommendations with data and research
 
 Focus on providing high-quality business planning assistance with well-researched, data-driven insights."""
 
-    agent = create_deep_agent(
-        tools=[internet_search],
-        system_prompt=system_prompt,
-        model=model
-    )
+# Rendered orchestrator prompts and their token counts, keyed by registry version
+_orchestrator_prompts: Dict[int, Tuple[str, int]] = {}
+_orchestrator_prompts_lock = threading.Lock()
+_ORCHESTRATOR_PROMPT_CACHE_SIZE = 4
+
+def build_orchestrator_prompt(snapshot: RegistrySnapshot) -> str:
+    """
+    Get the orchestrator system prompt for a registry snapshot.
+    
+    The prompt is rendered once per registry version and reused until the
+    set of enabled agents changes, so repeated calls return the same,
+    byte-identical string (which also keeps provider-side prompt prefix
+    caching effective).
+    
+    Args:
+        snapshot: Registry snapshot whose agents are listed in the prompt
+        
+    Returns:
+        Orchestrator system prompt
+    """
+    
+    cached = _orchestrator_prompts.get(snapshot.version)
+    if cached is not None:
+        return cached[0]
+    
+    agent_descriptions = "\n".join([
+        f"- **{spec['title']}**: {spec['description']}"
+        for spec in snapshot.specs
+    ])
+    prompt = ORCHESTRATOR_PROMPT_TEMPLATE.format(agent_descriptions=agent_descriptions)
+    
+    with _orchestrator_prompts_lock:
+        _orchestrator_prompts[snapshot.version] = (prompt, count_tokens(prompt))
+        while len(_orchestrator_prompts) > _ORCHESTRATOR_PROMPT_CACHE_SIZE:
+            _orchestrator_prompts.pop(min(_orchestrator_prompts))
     
-    return agent
+    return prompt
+
+def orchestrator_prompt_tokens(snapshot: RegistrySnapshot) -> int:
+    """
+    Get the token count of the orchestrator system prompt for a snapshot.
+    
+    Args:
+        snapshot: Registry snapshot whose agents are listed in the prompt
+        
+    Returns:
+        Number of prompt tokens (computed once per registry version)
+    """
+    
+    prompt = build_orchestrator_prompt(snapshot)
+    cached = _orchestrator_prompts.get(snapshot.version)
+    return cached[1] if cached is not None else count_tokens(prompt)
+
+def create_main_orchestrator(snapshot: Optional[RegistrySnapshot] = None):
+    """
+    Create the main Deep Agent orchestrator.
+    
+    This agent analyzes incoming tasks and uses available tools to complete them.
+    
+    Args:
+        snapshot: Registry snapshot to describe (defaults to the current one),
+            so a request keeps the agent set it started with
+    """
+    
+    if snapshot is None:
+        snapshot = get_registry().snapshot()
+    
+    system_prompt = build_orchestrator_prompt(snapshot)
+    
+    return AGENT_POOL.get(ORCHESTRATOR_NAME, system_prompt, make_search_tools())
+
+def warm_agent_pool(snapshot: Optional[RegistrySnapshot] = None) -> None:
+    """
+    Build every enabled agent and the orchestrator ahead of the first request.
+    
+    Args:
+        snapshot: Registry snapshot to build (defaults to the current one)
+    """
+    
+    if snapshot is None:
+        snapshot = get_registry().snapshot()
+    
+    for spec in snapshot.specs:
+        try:
+            create_agent_from_spec(spec)
+        except Exception as e:
+            print(f"✗ Failed to create agent {spec['name']}: {e}")
+    create_main_orchestrator(snapshot)
+    
+    stats = AGENT_POOL.stats()
+    print(f"✓ Agent pool ready: {stats['size']} agent(s) built in {stats['build_seconds_total']}s")
+
+def _rebuild_changed_agents(old: RegistrySnapshot, new: RegistrySnapshot, changed: set) -> None:
+    """Registry listener: rebuild only the agents whose specs changed."""
+    
+    if old.version == 0:
+        return
+    
+    for name in changed:
+        spec = new.get(name)
+        if spec is None:
+            AGENT_POOL.evict(name)
+        else:
+            create_agent_from_spec(spec)
+    
+    # The orchestrator prompt lists every agent, so any change affects it
+    if changed:
+        create_main_orchestrator(new)
+
+get_registry().subscribe(_rebuild_changed_agents)
 
 # ============================================================================
 # EXAMPLE USAGE
@@ -334,11 +406,7 @@ def run_example_competitive_analysis():
     
     print(f"\nQuery: {query}\n")
     
-    result = agent.invoke({
-        "messages": [{"role": "user", "content": query}]
-    })
-    
-    response = result["messages"][-1].content
+    response = invoke_agent(agent, query)
     print(f"\n{'=' * 70}")
     print("RESULT:")
     print(f"{'=' * 70}")
@@ -365,11 +433,7 @@ def run_example_financial_analysis():
     
     print(f"\nQuery: {query}\n")
     
-    result = agent.invoke({
-        "messages": [{"role": "user", "content": query}]
-    })
-    
-    response = result["messages"][-1].content
+    response = invoke_agent(agent, query)
     print(f"\n{'=' * 70}")
     print("RESULT:")
     print(f"{'=' * 70}")
@@ -398,11 +462,7 @@ def run_example_mixed_analysis():
     
     print(f"\nQuery: {query}\n")
     
-    result = agent.invoke({
-        "messages": [{"role": "user", "content": query}]
-    })
-    
-    response = result["messages"][-1].content
+    response = invoke_agent(agent, query)
     print(f"\n{'=' * 70}")
     print("RESULT:")
     print(f"{'=' * 70}")
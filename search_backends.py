@@ -0,0 +1,231 @@
+"""
+Search Backends for Business Plan Creator
+
+internet_search talks to a SearchBackend instead of DuckDuckGo directly, so
+agent runs can be benchmarked and load-tested without live network traffic.
+
+Backends (SEARCH_BACKEND):
+- ddgs: DuckDuckGo through pooled DDGS clients (default)
+- fixture: recorded results from a JSON file, with configurable latency and
+  error injection; queries missing from the fixture get deterministic
+  synthetic results
+
+Fixture format (queries are matched after canonical_query):
+    {"general": {"saas market size": [{"title": ..., "href": ..., "body": ...}]},
+     "news": {...}}
+
+Usage (record a fixture from the shared search cache):
+    python search_backends.py record fixtures/search.json
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Protocol
+
+from search_cache import normalize_query
+from query_canonical import canonical_query
+from search_clients import ClientPool
+
+try:
+    from duckduckgo_search import DDGS
+except ImportError:  # Only the fixture backend is available
+    DDGS = None
+
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'ddgs')
+SEARCH_FIXTURE_PATH = os.getenv('SEARCH_FIXTURE_PATH', '')
+SEARCH_FIXTURE_LATENCY_MS = float(os.getenv('SEARCH_FIXTURE_LATENCY_MS', '300'))
+SEARCH_FIXTURE_JITTER_MS = float(os.getenv('SEARCH_FIXTURE_JITTER_MS', '100'))
+SEARCH_FIXTURE_ERROR_RATE = float(os.getenv('SEARCH_FIXTURE_ERROR_RATE', '0'))
+SEARCH_FIXTURE_SEED = int(os.getenv('SEARCH_FIXTURE_SEED', '0'))
+
+class SearchBackend(Protocol):
+    """Blocking search call made from the search I/O threads."""
+
+    name: str
+
+    def search(self, query: str, max_results: int, search_type: str) -> List[Dict[str, Any]]:
+        """Return raw result dictionaries (title, href/url, body); raise on failure."""
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend counters for health/metrics endpoints."""
+
+class DDGSBackend:
+    """
+    DuckDuckGo through a pool of reused DDGS clients.
+
+    Args:
+        timeout: Per-request timeout in seconds
+        max_idle: Idle clients kept for reuse
+    """
+
+    name = 'ddgs'
+
+    def __init__(self, timeout: float, max_idle: int):
+        if DDGS is None:
+            raise ImportError("duckduckgo_search is required for SEARCH_BACKEND=ddgs")
+        self.clients = ClientPool(lambda: DDGS(timeout=timeout), max_idle=max_idle)
+
+    def search(self, query: str, max_results: int, search_type: str) -> List[Dict[str, Any]]:
+        with self.clients.client() as ddgs:
+            # DDGS spaces out requests made on the same instance; pacing is the
+            # shared rate limiter's job, so a reused client should not add a delay
+            ddgs.sleep_timestamp = 0.0
+            if search_type == "news":
+                return list(ddgs.news(query, max_results=max_results))
+            return list(ddgs.text(query, max_results=max_results))
+
+    def stats(self) -> Dict[str, Any]:
+        return {'name': self.name, 'clients': self.clients.stats()}
+
+class FixtureBackend:
+    """
+    Recorded results with simulated latency and failures.
+
+    Latency and failures come from a seeded random generator, so a run with
+    the same seed and the same sequence of calls is repeatable.
+
+    Args:
+        path: Fixture JSON file (empty for synthetic results only)
+        latency_ms: Mean simulated latency per call
+        jitter_ms: Maximum deviation from the mean latency
+        error_rate: Probability that a call raises
+        seed: Random seed for latency and failures
+    """
+
+    name = 'fixture'
+
+    def __init__(
+        self,
+        path: str = '',
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0
+    ):
+        self.path = path
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.fixtures: Dict[str, Dict[str, List[Dict[str, Any]]]] = {'general': {}, 'news': {}}
+        if path:
+            with open(path, encoding='utf-8') as f:
+                for search_type, queries in json.load(f).items():
+                    self.fixtures[search_type] = {canonical_query(q): r for q, r in queries.items()}
+        self.calls = 0
+        self.fixture_hits = 0
+        self.injected_errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def search(self, query: str, max_results: int, search_type: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.injected_errors += 1
+
+        time.sleep(delay)
+        if fail:
+            raise RuntimeError(f"Injected search failure for {query!r}")
+
+        recorded = self.fixtures.get(search_type, {}).get(canonical_query(query))
+        if recorded is not None:
+            with self._lock:
+                self.fixture_hits += 1
+            return recorded[:max_results]
+        return synthetic_results(query, max_results, search_type)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'name': self.name,
+                'path': self.path,
+                'queries': sum(len(q) for q in self.fixtures.values()),
+                'latency_ms': self.latency_ms,
+                'jitter_ms': self.jitter_ms,
+                'error_rate': self.error_rate,
+                'calls': self.calls,
+                'fixture_hits': self.fixture_hits,
+                'injected_errors': self.injected_errors
+            }
+
+def synthetic_results(query: str, max_results: int, search_type: str) -> List[Dict[str, Any]]:
+    """Deterministic placeholder results for a query missing from the fixture."""
+
+    digest = hashlib.sha1(f"{search_type}:{normalize_query(query)}".encode('utf-8')).hexdigest()[:8]
+    slug = '-'.join(normalize_query(query).split())[:60]
+    return [
+        {
+            'title': f"{query} ({search_type} result {i})",
+            'href': f"https://fixture-{i % 3}.example.com/{digest}/{slug}/{i}",
+            'body': f"Synthetic {search_type} result {i} for '{query}', served by the fixture search backend."
+        }
+        for i in range(1, max_results + 1)
+    ]
+
+def open_search_backend(timeout: float, max_idle: int) -> SearchBackend:
+    """
+    Backend configured by SEARCH_BACKEND and the SEARCH_FIXTURE_* variables.
+
+    Args:
+        timeout: Per-request timeout for network backends
+        max_idle: Idle clients kept by network backends
+
+    Returns:
+        The configured backend
+    """
+
+    if SEARCH_BACKEND == 'fixture':
+        backend = FixtureBackend(
+            SEARCH_FIXTURE_PATH,
+            SEARCH_FIXTURE_LATENCY_MS,
+            SEARCH_FIXTURE_JITTER_MS,
+            SEARCH_FIXTURE_ERROR_RATE,
+            SEARCH_FIXTURE_SEED
+        )
+        print(f"⚠ Using fixture search backend ({backend.stats()['queries']} recorded queries)")
+        return backend
+    if SEARCH_BACKEND != 'ddgs':
+        raise ValueError(f"Unknown SEARCH_BACKEND {SEARCH_BACKEND!r} (expected 'ddgs' or 'fixture')")
+    return DDGSBackend(timeout, max_idle)
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main():
+    """Command line entry point for recording fixtures."""
+
+    parser = argparse.ArgumentParser(description="Search backend fixtures")
+    parser.add_argument('command', choices=['record'])
+    parser.add_argument('output', help='fixture JSON file to write')
+    args = parser.parse_args()
+
+    from search_cache import open_shared_cache
+    cache = open_shared_cache()
+    if cache is None:
+        print("Shared search cache is disabled (SEARCH_CACHE_DB=off)")
+        sys.exit(1)
+
+    fixtures: Dict[str, Dict[str, List[Dict[str, Any]]]] = {'general': {}, 'news': {}}
+    for (query, _, search_type), results in cache.entries():
+        # Keep the longest result list recorded for each query
+        current = fixtures.setdefault(search_type, {}).get(query)
+        if current is None or len(results) > len(current):
+            fixtures[search_type][query] = results
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(fixtures, indent=2), encoding='utf-8')
+    print(f"✓ Recorded {sum(len(q) for q in fixtures.values())} queries to {output}")
+
+if __name__ == "__main__":
+    main()
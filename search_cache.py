@@ -0,0 +1,451 @@
+"""
+Search Result Cache for Business Plan Creator
+
+Caches for internet_search results. The orchestrator and its subagents
+repeat the same queries within and across runs, so a hit saves a DuckDuckGo
+round trip (and any backoff) entirely.
+
+Features:
+- Keyed on canonical query (see query_canonical.py), max_results and search_type
+- In-process LRU cache bounded by entry count and approximate memory
+- Persistent SQLite cache (WAL mode) shared by every process on the host
+- Separate TTLs for "general" and "news" searches
+- Expired rows kept for a grace period so outages can be served stale
+- Hit/miss/eviction counters
+
+Usage (maintenance of the shared cache):
+    python search_cache.py stats|compact|vacuum|clear
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import argparse
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from query_canonical import canonical_query
+
+# (canonical query, max_results, search_type)
+CacheKey = Tuple[str, int, str]
+
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', '2048'))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv('SEARCH_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+SEARCH_CACHE_TTLS = {
+    'general': float(os.getenv('SEARCH_CACHE_TTL_GENERAL', '86400')),
+    'news': float(os.getenv('SEARCH_CACHE_TTL_NEWS', '900'))
+}
+
+# Shared on-disk cache; set SEARCH_CACHE_DB=off to disable it
+SEARCH_CACHE_DB = os.getenv('SEARCH_CACHE_DB', str(Path(__file__).parent / ".cache" / "search_cache.sqlite3"))
+SEARCH_CACHE_DB_MAX_BYTES = int(os.getenv('SEARCH_CACHE_DB_MAX_BYTES', str(256 * 1024 * 1024)))
+
+# How long expired rows stay available as a fallback while search is down
+SEARCH_CACHE_STALE_SECONDS = float(os.getenv('SEARCH_CACHE_STALE_SECONDS', str(7 * 86400)))
+
+# Rough per-entry bookkeeping overhead (key, tuple, dicts)
+_ENTRY_OVERHEAD_BYTES = 256
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries share a key."""
+
+    return ' '.join(query.lower().split())
+
+def search_cache_key(query: str, max_results: int, search_type: str) -> CacheKey:
+    """
+    Build the cache key for a search.
+
+    The query is canonicalized, so reordered, re-punctuated or differently
+    pluralized queries share a key.
+
+    Args:
+        query: Search query string
+        max_results: Maximum number of results requested
+        search_type: Type of search ("general" or "news")
+
+    Returns:
+        Hashable cache key
+    """
+
+    return (canonical_query(query), int(max_results), search_type)
+
+def estimate_size(results: List[Dict[str, Any]]) -> int:
+    """Approximate memory footprint of a result list in bytes."""
+
+    size = _ENTRY_OVERHEAD_BYTES
+    for result in results:
+        for key, value in result.items():
+            size += len(key) + (len(value) if isinstance(value, str) else 16)
+    return size
+
+class SearchCache:
+    """
+    Thread-safe TTL + LRU cache of raw search results.
+
+    Values are the raw result dictionaries returned by the search backend,
+    so callers can re-format or trim them as needed. Cached lists are shared
+    between callers and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+        max_bytes: int = SEARCH_CACHE_MAX_BYTES,
+        ttls: Optional[Dict[str, float]] = None
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = dict(ttls or SEARCH_CACHE_TTLS)
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self._items: "OrderedDict[CacheKey, Tuple[float, int, List[Dict[str, Any]]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up cached results.
+
+        Args:
+            key: Cache key from search_cache_key()
+
+        Returns:
+            Cached result list, or None on a miss or expired entry
+        """
+
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            expires_at, size, results = item
+            if expires_at <= time.monotonic():
+                del self._items[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._items.move_to_end(key)
+            self.hits += 1
+            return results
+
+    def set(self, key: CacheKey, results: List[Dict[str, Any]], ttl: Optional[float] = None) -> None:
+        """
+        Store results, evicting least recently used entries over the bounds.
+
+        Args:
+            key: Cache key from search_cache_key()
+            results: Raw result dictionaries
+            ttl: Seconds to keep the entry (defaults to the search type's TTL)
+        """
+
+        if ttl is None:
+            ttl = self.ttls.get(key[2], self.ttls['general'])
+        if ttl <= 0:
+            return
+
+        size = estimate_size(results)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._items[key] = (time.monotonic() + ttl, size, results)
+            self._bytes += size
+
+            while len(self._items) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._items.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached entry (counters are kept)."""
+
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for health/metrics endpoints."""
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._items),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'expirations': self.expirations,
+                'evictions': self.evictions,
+                'ttl_seconds': dict(self.ttls)
+            }
+
+# ============================================================================
+# PERSISTENT SHARED CACHE
+# ============================================================================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_results (
+    query TEXT NOT NULL,
+    max_results INTEGER NOT NULL,
+    search_type TEXT NOT NULL,
+    results TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (query, max_results, search_type)
+);
+CREATE INDEX IF NOT EXISTS search_results_expires ON search_results (expires_at);
+CREATE INDEX IF NOT EXISTS search_results_created ON search_results (created_at);
+"""
+
+class SQLiteSearchCache:
+    """
+    Disk-backed search cache in a single SQLite file.
+
+    WAL mode lets API workers and batch script.py runs read concurrently
+    while one of them writes, so research done by one process is reused by
+    every later one. Every operation is best-effort: database errors are
+    counted and treated as a miss, never surfaced to the agent.
+    """
+
+    # Run size-based compaction after this many writes
+    COMPACT_EVERY = 200
+
+    def __init__(
+        self,
+        path: str = SEARCH_CACHE_DB,
+        max_bytes: int = SEARCH_CACHE_DB_MAX_BYTES,
+        ttls: Optional[Dict[str, float]] = None,
+        stale_seconds: float = SEARCH_CACHE_STALE_SECONDS
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.stale_seconds = stale_seconds
+        self.ttls = dict(ttls or SEARCH_CACHE_TTLS)
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.errors = 0
+        self._writes = 0
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: CacheKey) -> Optional[Tuple[List[Dict[str, Any]], float]]:
+        """
+        Look up cached results.
+
+        Args:
+            key: Cache key from search_cache_key()
+
+        Returns:
+            Tuple of (results, seconds until expiry), or None on a miss
+        """
+
+        try:
+            row = self._connect().execute(
+                'SELECT results, expires_at FROM search_results '
+                'WHERE query = ? AND max_results = ? AND search_type = ? AND expires_at > ?',
+                (*key, time.time())
+            ).fetchone()
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+            return None
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(row[0]), row[1] - time.time()
+
+    def get_stale(self, key: CacheKey) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up results even if they have expired (within the stale grace period).
+
+        Args:
+            key: Cache key from search_cache_key()
+
+        Returns:
+            Cached results, or None if nothing was ever stored or it was compacted away
+        """
+
+        try:
+            row = self._connect().execute(
+                'SELECT results FROM search_results '
+                'WHERE query = ? AND max_results = ? AND search_type = ?',
+                key
+            ).fetchone()
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+            return None
+
+        if row is None:
+            return None
+
+        self.stale_hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: CacheKey, results: List[Dict[str, Any]]) -> None:
+        """
+        Store results for every process on the host.
+
+        Args:
+            key: Cache key from search_cache_key()
+            results: Raw result dictionaries
+        """
+
+        ttl = self.ttls.get(key[2], self.ttls['general'])
+        if ttl <= 0:
+            return
+
+        payload = json.dumps(results, separators=(',', ':'), default=str)
+        now = time.time()
+        try:
+            self._connect().execute(
+                'INSERT OR REPLACE INTO search_results VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (*key, payload, len(payload), now, now + ttl)
+            )
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+            return
+
+        self._writes += 1
+        if self._writes % self.COMPACT_EVERY == 0:
+            self.compact()
+
+    def compact(self) -> int:
+        """
+        Delete rows past the stale grace period, then the oldest rows until under max_bytes.
+
+        Returns:
+            Number of rows deleted
+        """
+
+        try:
+            conn = self._connect()
+            deleted = conn.execute(
+                'DELETE FROM search_results WHERE expires_at <= ?', (time.time() - self.stale_seconds,)
+            ).rowcount
+
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM search_results').fetchone()[0]
+            if total > self.max_bytes:
+                # Walk from the oldest row and cut once enough bytes are freed
+                excess = total - self.max_bytes
+                cutoff = None
+                for created_at, size in conn.execute(
+                    'SELECT created_at, size FROM search_results ORDER BY created_at'
+                ):
+                    excess -= size
+                    cutoff = created_at
+                    if excess <= 0:
+                        break
+                if cutoff is not None:
+                    deleted += conn.execute(
+                        'DELETE FROM search_results WHERE created_at <= ?', (cutoff,)
+                    ).rowcount
+            return deleted
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+            return 0
+
+    def entries(self) -> Iterator[Tuple[CacheKey, List[Dict[str, Any]]]]:
+        """Yield every stored (key, results) pair, expired rows included."""
+
+        for query, max_results, search_type, payload in self._connect().execute(
+            'SELECT query, max_results, search_type, results FROM search_results'
+        ):
+            yield (query, max_results, search_type), json.loads(payload)
+
+    def vacuum(self) -> None:
+        """Compact, then rebuild the database file to return space to the OS."""
+
+        self.compact()
+        conn = self._connect()
+        conn.execute('VACUUM')
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def clear(self) -> None:
+        """Delete every cached row."""
+
+        self._connect().execute('DELETE FROM search_results')
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for health/metrics endpoints."""
+
+        stats = {
+            'path': str(self.path),
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale_hits': self.stale_hits,
+            'errors': self.errors,
+            'max_bytes': self.max_bytes
+        }
+        try:
+            entries, size = self._connect().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM search_results'
+            ).fetchone()
+            stats.update({'entries': entries, 'bytes': size})
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+        return stats
+
+def open_shared_cache() -> Optional[SQLiteSearchCache]:
+    """Shared on-disk cache configured by SEARCH_CACHE_DB (None if disabled)."""
+
+    if SEARCH_CACHE_DB.lower() in ('', 'off', 'none', 'false'):
+        return None
+    return SQLiteSearchCache(SEARCH_CACHE_DB)
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main():
+    """Command line entry point for maintaining the shared cache."""
+
+    parser = argparse.ArgumentParser(description="Shared search cache maintenance")
+    parser.add_argument('command', choices=['stats', 'compact', 'vacuum', 'clear'])
+    args = parser.parse_args()
+
+    cache = open_shared_cache()
+    if cache is None:
+        print("Shared search cache is disabled (SEARCH_CACHE_DB=off)")
+        sys.exit(1)
+
+    if args.command == 'compact':
+        print(f"✓ Deleted {cache.compact()} row(s)")
+    elif args.command == 'vacuum':
+        cache.vacuum()
+        print(f"✓ Vacuumed {cache.path}")
+    elif args.command == 'clear':
+        cache.clear()
+        print(f"✓ Cleared {cache.path}")
+    print(json.dumps(cache.stats(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Search Client Pool for Business Plan Creator
+
+Keeps DuckDuckGo clients (and their HTTP sessions, TLS connections and
+cookies) alive between searches instead of building a new DDGS per attempt.
+
+A client is used by one thread at a time: callers check one out, run their
+query and check it back in. Clients that raised are discarded, and clients
+are recycled after a number of uses or an age limit so a session that DuckDuckGo
+has started to throttle does not live forever.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, List
+
+SEARCH_CLIENT_MAX_USES = int(os.getenv('SEARCH_CLIENT_MAX_USES', '200'))
+SEARCH_CLIENT_MAX_AGE = float(os.getenv('SEARCH_CLIENT_MAX_AGE', '600'))
+
+class _PooledClient:
+    __slots__ = ('client', 'created_at', 'uses')
+
+    def __init__(self, client: Any):
+        self.client = client
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+class ClientPool:
+    """
+    Thread-safe pool of reusable clients.
+
+    Args:
+        factory: Creates a new client
+        max_idle: Idle clients kept for reuse (extra ones are dropped on check-in)
+        max_uses: Uses before a client is recycled (<= 0 for no limit)
+        max_age: Seconds before a client is recycled (<= 0 for no limit)
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_idle: int,
+        max_uses: int = SEARCH_CLIENT_MAX_USES,
+        max_age: float = SEARCH_CLIENT_MAX_AGE
+    ):
+        self.factory = factory
+        self.max_idle = max_idle
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self.recycled = 0
+        self._idle: List[_PooledClient] = []
+        self._in_use = 0
+        self._lock = threading.Lock()
+
+    def _expired(self, pooled: _PooledClient) -> bool:
+        return (self.max_uses > 0 and pooled.uses >= self.max_uses) or (
+            self.max_age > 0 and time.monotonic() - pooled.created_at >= self.max_age
+        )
+
+    def _checkout(self) -> _PooledClient:
+        with self._lock:
+            while self._idle:
+                # LIFO keeps the most recently used (warmest) connection busy
+                pooled = self._idle.pop()
+                if self._expired(pooled):
+                    self.recycled += 1
+                    continue
+                self.reused += 1
+                self._in_use += 1
+                return pooled
+            self.created += 1
+            self._in_use += 1
+
+        return _PooledClient(self.factory())
+
+    def _checkin(self, pooled: _PooledClient, healthy: bool) -> None:
+        pooled.uses += 1
+        with self._lock:
+            self._in_use -= 1
+            if not healthy:
+                self.discarded += 1
+            elif self._expired(pooled):
+                self.recycled += 1
+            elif len(self._idle) < self.max_idle:
+                self._idle.append(pooled)
+
+    @contextmanager
+    def client(self) -> Iterator[Any]:
+        """
+        Borrow a client for one call.
+
+        A client whose call raised is discarded instead of returned, so a
+        broken or throttled session is replaced by a fresh one.
+
+        Yields:
+            A client used by no other thread until it is checked back in
+        """
+
+        pooled = self._checkout()
+        try:
+            yield pooled.client
+        except BaseException:
+            self._checkin(pooled, healthy=False)
+            raise
+        else:
+            self._checkin(pooled, healthy=True)
+
+    def clear(self) -> None:
+        """Drop every idle client (clients in use are dropped on check-in)."""
+
+        with self._lock:
+            self._idle.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool counters for health/metrics endpoints."""
+
+        with self._lock:
+            checkouts = self.created + self.reused
+            return {
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'created': self.created,
+                'reused': self.reused,
+                'reuse_rate': round(self.reused / checkouts, 3) if checkouts else None,
+                'discarded': self.discarded,
+                'recycled': self.recycled
+            }
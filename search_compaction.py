@@ -0,0 +1,201 @@
+"""
+Search Result Compaction for Business Plan Creator
+
+Search output lands in the agent's message history and is re-sent on every
+later LLM turn, so each token returned by internet_search is paid for many
+times against the TPM quota. This module shrinks raw results before they
+are formatted:
+
+- Drops results without a title or URL
+- Drops repeated URLs and caps results per domain
+- Trims snippets to a token budget at a word boundary
+- Stops adding results once the per-call token budget is spent
+
+The stages are generators chained into one lazy pipeline (iter_compacted),
+so results can be forwarded as they arrive and nothing past the budget is
+processed.
+
+Savings are tracked in SEARCH_COMPACTION_STATS for /api/health.
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, Iterator, Any, Optional, Set
+from urllib.parse import urlsplit
+
+from token_count import count_tokens, CHARS_PER_TOKEN
+
+# Default token budget for one search tool call (per-agent override: search.token_budget)
+SEARCH_RESULT_TOKEN_BUDGET = int(os.getenv('SEARCH_RESULT_TOKEN_BUDGET', '1000'))
+SEARCH_SNIPPET_MAX_TOKENS = int(os.getenv('SEARCH_SNIPPET_MAX_TOKENS', '60'))
+SEARCH_MAX_PER_DOMAIN = int(os.getenv('SEARCH_MAX_PER_DOMAIN', '2'))
+
+# Tokens for the numbering, bold markers and "URL:" label of one entry
+_ENTRY_OVERHEAD_TOKENS = 8
+
+def result_url(result: Dict[str, Any]) -> str:
+    """Get a result's URL in a form suitable for deduplication."""
+
+    return result.get('href', result.get('url', '')).strip().rstrip('/')
+
+def result_domain(url: str) -> str:
+    """Get the host of a URL without a leading "www."."""
+
+    host = urlsplit(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+def trim_snippet(snippet: str, max_tokens: int) -> str:
+    """
+    Shorten a snippet to roughly max_tokens, cutting at a word boundary.
+
+    Args:
+        snippet: Result snippet text
+        max_tokens: Token limit (<= 0 keeps the snippet as is)
+
+    Returns:
+        The snippet, shortened with a trailing ellipsis if needed
+    """
+
+    snippet = ' '.join(snippet.split())
+    if max_tokens <= 0 or count_tokens(snippet) <= max_tokens:
+        return snippet
+
+    cut = snippet[:max_tokens * CHARS_PER_TOKEN]
+    while cut and count_tokens(cut) > max_tokens:
+        cut = cut[:int(len(cut) * 0.9)]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' ,;:.') + '…'
+
+def iter_valid(raw_results: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Quality filter: drop results without a title or URL."""
+
+    for r in raw_results:
+        if r.get('title', '') and result_url(r):
+            yield r
+
+def iter_unique(
+    results: Iterable[Dict[str, Any]],
+    max_per_domain: int = SEARCH_MAX_PER_DOMAIN,
+    seen_urls: Optional[Set[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Drop repeated URLs and cap results per domain.
+
+    Args:
+        results: Result dictionaries
+        max_per_domain: Results kept per domain (<= 0 for no cap)
+        seen_urls: URLs already emitted elsewhere (updated in place)
+    """
+
+    seen_urls = set() if seen_urls is None else seen_urls
+    per_domain: Dict[str, int] = {}
+    for r in results:
+        url = result_url(r)
+        if url in seen_urls:
+            continue
+        domain = result_domain(url)
+        if max_per_domain > 0 and per_domain.get(domain, 0) >= max_per_domain:
+            continue
+        seen_urls.add(url)
+        per_domain[domain] = per_domain.get(domain, 0) + 1
+        yield r
+
+def iter_budgeted(
+    results: Iterable[Dict[str, Any]],
+    token_budget: int,
+    snippet_tokens: int = SEARCH_SNIPPET_MAX_TOKENS
+) -> Iterator[Dict[str, Any]]:
+    """
+    Trim snippets and stop once the token budget is spent.
+
+    Stopping ends the pipeline: results past the budget are never pulled
+    from the earlier stages, trimmed or counted.
+
+    Args:
+        results: Result dictionaries with a title and URL
+        token_budget: Approximate token cap (<= 0 for no cap)
+        snippet_tokens: Token cap per snippet (<= 0 for no trimming)
+    """
+
+    spent = 0
+    kept = 0
+    for r in results:
+        title = r.get('title', '')
+        url = result_url(r)
+        snippet = trim_snippet(r.get('body', r.get('description', '')), snippet_tokens)
+        cost = count_tokens(title) + count_tokens(url) + count_tokens(snippet) + _ENTRY_OVERHEAD_TOKENS
+        if token_budget > 0 and kept and spent + cost > token_budget:
+            return
+        spent += cost
+        kept += 1
+        yield {'title': title, 'href': url, 'body': snippet}
+
+def iter_compacted(
+    raw_results: Iterable[Dict[str, Any]],
+    token_budget: Optional[int] = None,
+    snippet_tokens: int = SEARCH_SNIPPET_MAX_TOKENS,
+    max_per_domain: int = SEARCH_MAX_PER_DOMAIN,
+    seen_urls: Optional[Set[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazy filter -> dedupe -> trim/budget pipeline over raw results.
+
+    Results keep their order and are yielded as soon as they pass every
+    stage, so a consumer can forward them while later results are still
+    arriving. The first result is always kept so a tight budget never turns
+    a hit into "no results".
+
+    Args:
+        raw_results: Raw result dictionaries, or a generator of them
+        token_budget: Approximate token cap for the formatted output
+            (None for SEARCH_RESULT_TOKEN_BUDGET, <= 0 for no cap)
+        snippet_tokens: Token cap per snippet (<= 0 for no trimming)
+        max_per_domain: Results kept per domain (<= 0 for no cap)
+        seen_urls: URLs already emitted elsewhere (updated in place)
+
+    Yields:
+        New result dictionaries with title, href and trimmed body
+    """
+
+    if token_budget is None:
+        token_budget = SEARCH_RESULT_TOKEN_BUDGET
+    yield from iter_budgeted(
+        iter_unique(iter_valid(raw_results), max_per_domain, seen_urls), token_budget, snippet_tokens
+    )
+
+class CompactionStats:
+    """Thread-safe counters of tokens returned vs tokens saved."""
+
+    def __init__(self):
+        self.calls = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.results_before = 0
+        self.results_after = 0
+        self._lock = threading.Lock()
+
+    def record(self, tokens_before: int, tokens_after: int, results_before: int, results_after: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.tokens_before += tokens_before
+            self.tokens_after += tokens_after
+            self.results_before += results_before
+            self.results_after += results_after
+
+    def stats(self) -> Dict[str, Any]:
+        """Compaction counters for health/metrics endpoints."""
+
+        with self._lock:
+            saved = self.tokens_before - self.tokens_after
+            return {
+                'calls': self.calls,
+                'token_budget': SEARCH_RESULT_TOKEN_BUDGET,
+                'tokens_before': self.tokens_before,
+                'tokens_after': self.tokens_after,
+                'tokens_saved': saved,
+                'saved_ratio': round(saved / self.tokens_before, 3) if self.tokens_before else None,
+                'results_dropped': self.results_before - self.results_after
+            }
+
+SEARCH_COMPACTION_STATS = CompactionStats()
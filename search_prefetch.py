@@ -0,0 +1,228 @@
+"""
+Speculative Search Prefetch for Business Plan Creator
+
+Nothing is searched until the agent's first LLM turn decides to call
+internet_search, so research starts one full model round trip late. When a
+chat request names several companies or products ("Tableau, Power BI,
+Looker"), the agent is almost certain to research each of them, so those
+searches are started locally while the first LLM call is still running.
+Results land in the search caches and the research corpus; a later tool
+call for the same query is a cache hit or joins the in-flight search.
+
+Extraction is deliberately conservative: only names that appear in an
+enumeration (comma/and/or/vs lists) of at least two products or companies
+are used, each combined with the words that introduce the list ("BI tools",
+"project management software"). Places, section headings, metric acronyms
+and reporting periods are never treated as names. Prefetch is off by
+default and only spends rate-limit tokens the agents are not waiting for.
+"""
+
+import os
+import re
+import asyncio
+import threading
+from typing import Dict, Any, List
+
+import web_search
+from query_canonical import canonical_query
+
+SEARCH_PREFETCH = os.getenv('SEARCH_PREFETCH', 'false').lower() == 'true'
+SEARCH_PREFETCH_MAX_QUERIES = int(os.getenv('SEARCH_PREFETCH_MAX_QUERIES', '5'))
+
+# A prefetch only calls DuckDuckGo while at least this many rate-limit tokens
+# are free, so it never queues ahead of (or drains the burst for) agent calls
+SEARCH_PREFETCH_MIN_TOKENS = float(os.getenv('SEARCH_PREFETCH_MIN_TOKENS', '2'))
+
+# A capitalized name, possibly several words or an acronym ("Power BI", "SAP", "Monday.com")
+# A dot only counts between word characters, so names never run across sentences
+_NAME_CHARS = r"(?:[\w&+\-]|\.(?=\w))*"
+_NAME = rf"[A-Z]{_NAME_CHARS}(?:\s+(?:[A-Z]{_NAME_CHARS}|\d{_NAME_CHARS}))*"
+_LIST = re.compile(
+    rf"(?P<items>{_NAME}(?:\s*,\s*{_NAME})*\s*,?\s+(?:and|or|vs\.?|versus)\s+{_NAME}"
+    rf"|{_NAME}(?:\s*,\s*{_NAME}){{2,}})"
+)
+_SPLIT = re.compile(r"\s*,\s*(?:and\s+|or\s+)?|\s+(?:and|or|vs\.?|versus)\s+")
+_CONTEXT_WORD = re.compile(r"[A-Za-z][\w\-]*")
+
+# Words that carry no topic: dropped from the context and from the start of names
+_COMMON_WORDS = frozenset("""
+    a about against align an analyse analyze and are as assess at be between build by can
+    compare compared comparing compete competing competitors could create do does each estimate
+    evaluate existing for from get give help how i in including is it know like live look me my
+    need of on or our please research review see should show such tell than that the their them
+    these think to top us use used using versus vs want we what which who why will with work
+    would you
+""".split())
+
+# Capitalized items that are not products or companies
+_PLACES = frozenset(p.strip() for p in """
+    africa, amsterdam, apac, asia, atlanta, austin, australia, bangalore, bay area, beijing,
+    berlin, boston, brazil, california, canada, chicago, china, dallas, denver, dubai, emea,
+    eu, europe, france, germany, hong kong, houston, india, italy, japan, la, latin america,
+    london, los angeles, madrid, mexico, miami, middle east, mumbai, new york, new york city,
+    north america, nyc, paris, san francisco, seattle, sf, shanghai, silicon valley,
+    singapore, south america, spain, sydney, texas, tokyo, toronto, uk, united kingdom,
+    united states, us, usa
+""".split(','))
+
+# A name ending in one of these is a document or plan section ("Executive Summary")
+_HEADING_WORDS = frozenset("""
+    analysis appendix conclusion description forecast forecasts introduction landscape
+    milestones model objectives overview plan plans positioning projection projections
+    requirements risks section sections statement statements strategy strategies summary
+""".split())
+
+# Business metrics and roles that appear as acronym lists ("TAM, SAM and SOM")
+_METRIC_WORDS = frozenset("""
+    arpu arr b2b b2c cac ceo cfo clv coca cto ebitda gmv kpi kpis ltv mom mrr nps p&l
+    pestle roi sam som swot tam yoy
+""".split())
+
+# Reporting periods ("Q1", "H2", "FY2025", "March")
+_PERIOD = re.compile(
+    r"q[1-4]|h[12]|fy\d*|\d+|january|february|march|april|may|june|july|august|september"
+    r"|october|november|december"
+)
+
+def _denied(name: str) -> bool:
+    """Whether a candidate name (or context word) is a place, heading, metric or period."""
+
+    words = name.lower().split()
+    return (
+        ' '.join(words) in _PLACES
+        or words[-1] in _HEADING_WORDS
+        or all(w in _METRIC_WORDS or _PERIOD.fullmatch(w) for w in words)
+    )
+
+def _content_words(text: str) -> List[str]:
+    return [w for w in _CONTEXT_WORD.findall(text) if w.lower() not in _COMMON_WORDS and not _denied(w)]
+
+def _context(before: str, after: str, max_words: int = 2) -> List[str]:
+    """
+    Topic words around a list: the last words before it in the same clause,
+    e.g. "existing BI tools (" -> ["BI", "tools"], else the first words after it.
+    """
+
+    words = _content_words(re.split(r"[.!?\n:;]", before)[-1])
+    if words:
+        return words[-max_words:]
+    return _content_words(re.split(r"[.!?\n:;]", after)[0])[:max_words]
+
+def _clean_name(name: str) -> str:
+    """Drop leading filler picked up at a sentence start ("Compare Asana" -> "Asana")."""
+
+    words = name.strip(' .').split()
+    while len(words) > 1 and words[0].lower() in _COMMON_WORDS:
+        words.pop(0)
+    return ' '.join(words)
+
+def extract_queries(message: str, max_queries: int = SEARCH_PREFETCH_MAX_QUERIES) -> List[str]:
+    """
+    Extract likely search queries from a user message.
+
+    Args:
+        message: User chat message
+        max_queries: Maximum number of queries to return
+
+    Returns:
+        Queries such as "Tableau BI tools", one per enumerated name
+    """
+
+    queries: List[str] = []
+    seen = set()
+    for match in _LIST.finditer(message):
+        names = [_clean_name(name) for name in _SPLIT.split(match.group('items'))]
+        names = [n for n in names if n and n.lower() not in _COMMON_WORDS and not _denied(n)]
+        if len(names) < 2:
+            # Mostly places, headings or periods: not a product list
+            continue
+        context = _context(message[:match.start()], message[match.end():])
+        for name in names:
+            if len(queries) >= max_queries:
+                break
+            extra = [w for w in context if w.lower() not in name.lower().split()]
+            query = ' '.join([name] + extra)
+            key = canonical_query(query)
+            if key not in seen:
+                seen.add(key)
+                queries.append(query)
+    return queries
+
+class SearchPrefetcher:
+    """Runs speculative searches on the search loop and counts their outcomes."""
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.cached = 0
+        self.fetched = 0
+        self.failed = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def _count(self, field: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + n)
+
+    async def _aprefetch(self, queries: List[str], max_results: int, search_type: str) -> None:
+        semaphore = asyncio.Semaphore(web_search.SEARCH_BATCH_CONCURRENCY)
+
+        async def one(query: str) -> None:
+            key = web_search.search_cache_key(query, max_results, search_type)
+            if await web_search.acache_get(key) is not None:
+                self._count('cached')
+                return
+            async with semaphore:
+                if web_search.SEARCH_RATE_LIMITER.available() < SEARCH_PREFETCH_MIN_TOKENS:
+                    # Agent searches need the burst; they will fetch this themselves
+                    self._count('skipped')
+                    return
+                try:
+                    await web_search.asearch_raw(query, max_results, search_type)
+                    self._count('fetched')
+                except web_search.SearchError:
+                    self._count('failed')
+
+        await asyncio.gather(*(one(q) for q in queries))
+
+    def prefetch(self, message: str, max_results: int = 5, search_type: str = "general") -> List[str]:
+        """
+        Start prefetching searches for a message without waiting for them.
+
+        Args:
+            message: User chat message
+            max_results: The agent's default max_results (part of the cache key)
+            search_type: The agent's default search type
+
+        Returns:
+            Queries being prefetched (empty if disabled or nothing was found)
+        """
+
+        if not SEARCH_PREFETCH:
+            return []
+        queries = extract_queries(message)
+        if not queries:
+            return []
+
+        self._count('requests')
+        self._count('queries', len(queries))
+        asyncio.run_coroutine_threadsafe(
+            self._aprefetch(queries, max_results, search_type), web_search.SEARCH_LOOP.loop()
+        )
+        return queries
+
+    def stats(self) -> Dict[str, Any]:
+        """Prefetch counters for health/metrics endpoints."""
+
+        with self._lock:
+            return {
+                'enabled': SEARCH_PREFETCH,
+                'requests': self.requests,
+                'queries': self.queries,
+                'already_cached': self.cached,
+                'fetched': self.fetched,
+                'failed': self.failed,
+                'skipped_rate_limited': self.skipped
+            }
+
+SEARCH_PREFETCHER = SearchPrefetcher()
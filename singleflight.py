@@ -0,0 +1,139 @@
+"""
+Singleflight call coalescing for Business Plan Creator
+
+When several requests issue the same search at once, only the first caller
+(the leader) does the work; concurrent callers with the same key wait for
+the leader and share its result or exception.
+
+Coalescing always works across coroutines on the same event loop. With a
+lock directory it also works across processes: the leader takes an flock on
+a per-key lock file and, once it holds the lock, re-checks a shared cache in
+case another process just finished the same call.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Any, Hashable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalesce within the process only
+    fcntl = None
+
+SINGLEFLIGHT_LOCK_DIR = os.getenv('SEARCH_SINGLEFLIGHT_LOCK_DIR', '')
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls that share a key.
+
+    Args:
+        lock_dir: Directory for per-key lock files (enables cross-process
+            coalescing where fcntl is available)
+    """
+
+    def __init__(self, lock_dir: Optional[str] = None):
+        self.lock_dir = Path(lock_dir) if lock_dir and fcntl is not None else None
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.coalesced_cross_process = 0
+        self._inflight: Dict[Tuple[int, Hashable], "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+
+    async def ado(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        recheck: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> Any:
+        """
+        Run fn once for all concurrent coroutines with the same key.
+
+        Followers await the leader's future without holding a thread.
+
+        Args:
+            key: Identifies equivalent calls
+            fn: Returns the awaitable that does the work; only the leader calls it
+            recheck: Returns an awaitable of a result already produced elsewhere
+                (e.g. a shared cache lookup) or None; awaited by the leader
+                after it acquires the cross-process lock
+
+        Returns:
+            The leader's result (followers re-raise the leader's exception)
+        """
+
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+
+        with self._lock:
+            self.calls += 1
+            future = self._inflight.get(flight_key)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                future = self._inflight[flight_key] = loop.create_future()
+                leader = True
+
+        if not leader:
+            # Shield so a cancelled follower does not cancel the leader's result
+            return await asyncio.shield(future)
+
+        try:
+            result = await self._arun(key, fn, recheck)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody was waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[flight_key]
+
+    def _lock_path(self, key: Hashable) -> Path:
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return self.lock_dir / f"{digest}.lock"
+
+    async def _arun(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        recheck: Optional[Callable[[], Awaitable[Any]]]
+    ) -> Any:
+        if self.lock_dir is None:
+            self.executions += 1
+            return await fn()
+
+        loop = asyncio.get_running_loop()
+        with open(self._lock_path(key), 'a+') as lock_file:
+            # Waiting for another process blocks, so do it off the event loop
+            await loop.run_in_executor(None, fcntl.flock, lock_file, fcntl.LOCK_EX)
+            try:
+                if recheck is not None:
+                    result = await recheck()
+                    if result is not None:
+                        self.coalesced_cross_process += 1
+                        return result
+                self.executions += 1
+                return await fn()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing counters for health/metrics endpoints."""
+
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'coalesced_cross_process': self.coalesced_cross_process,
+                'in_flight': len(self._inflight),
+                'cross_process': self.lock_dir is not None
+            }
@@ -0,0 +1,80 @@
+"""
+Token counting for prompt budgeting.
+
+Uses tiktoken's o200k_base encoding (the GPT-4o tokenizer) when it is
+installed and its encoding file is already in tiktoken's cache directory
+(TIKTOKEN_CACHE_DIR), and falls back to a character-based estimate
+otherwise. tiktoken would download a missing encoding file on first use,
+which stalls cold starts on isolated hosts, so downloading is opt-in
+(TOKENIZER_DOWNLOAD=true).
+"""
+
+import os
+import hashlib
+import tempfile
+from typing import Optional
+
+TOKENIZER_ENCODING = os.getenv('TOKENIZER_ENCODING', 'o200k_base')
+
+# Let tiktoken download a missing encoding file (otherwise only a cached one is used)
+TOKENIZER_DOWNLOAD = os.getenv('TOKENIZER_DOWNLOAD', 'false').lower() == 'true'
+
+# Where tiktoken fetches BPE encodings from; its cache files are named by sha1(url)
+_ENCODING_URL = "https://openaipublic.blob.core.windows.net/encodings/{}.tiktoken"
+
+# Rough average for English prose with GPT-4o-class tokenizers
+CHARS_PER_TOKEN = 4
+
+_encoding = None
+_encoding_loaded = False
+
+def _encoding_cached(name: str) -> bool:
+    """Whether tiktoken can load an encoding from its cache without the network."""
+
+    if 'TIKTOKEN_CACHE_DIR' in os.environ:
+        cache_dir = os.environ['TIKTOKEN_CACHE_DIR']
+    elif 'DATA_GYM_CACHE_DIR' in os.environ:
+        cache_dir = os.environ['DATA_GYM_CACHE_DIR']
+    else:
+        cache_dir = os.path.join(tempfile.gettempdir(), 'data-gym-cache')
+    if not cache_dir:  # Caching disabled: every load would download
+        return False
+    cache_key = hashlib.sha1(_ENCODING_URL.format(name).encode()).hexdigest()
+    return os.path.exists(os.path.join(cache_dir, cache_key))
+
+def _get_encoding() -> Optional[object]:
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        try:
+            import tiktoken
+            if TOKENIZER_DOWNLOAD or _encoding_cached(TOKENIZER_ENCODING):
+                _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        except Exception:
+            _encoding = None
+        _encoding_loaded = True
+    return _encoding
+
+def tokenizer_name() -> str:
+    """Name of the tokenizer in use ("o200k_base" or "estimate")."""
+
+    return TOKENIZER_ENCODING if _get_encoding() is not None else 'estimate'
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in a piece of text.
+
+    Args:
+        text: Text to count
+
+    Returns:
+        Number of tokens (exact with tiktoken, estimated otherwise)
+    """
+
+    if not text:
+        return 0
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
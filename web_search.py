@@ -0,0 +1,863 @@
+"""
+Web Search for Business Plan Creator
+
+DuckDuckGo search tool shared by the orchestrator and every subagent.
+The backend is pluggable (see search_backends.py) for offline load tests.
+
+Features:
+- Asyncio-native search with jittered, non-blocking backoff
+- Sync wrapper that runs searches on a shared background event loop
+- In-process TTL + LRU cache of raw results (see search_cache.py)
+- Shared SQLite cache so every process on the host reuses past searches
+- Pooled, reused DuckDuckGo clients (keep-alive sessions)
+- Shared token-bucket rate limit on DuckDuckGo requests
+- Circuit breaker that fails fast (serving stale cache) while DuckDuckGo is down
+- Canonical cache keys plus MinHash near-duplicate lookup for paraphrased queries
+- Singleflight coalescing of concurrent identical searches
+- Token-budgeted compaction of results before they reach the LLM
+- Local BM25 research corpus of every fetched result (local-first tool, offline mode)
+- Batched multi-query search with bounded fan-out and URL dedupe
+- search_type="both": general and news searched concurrently, fused by reciprocal rank
+- Per-request listener that receives each result as it passes the pipeline (SSE)
+- Per-agent tool variants with different default arguments
+"""
+
+import asyncio
+import contextvars
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Literal, Dict, List, Any, Optional, Tuple, Coroutine, Callable, Iterable, Iterator
+
+try:
+    from langchain_core.tools import StructuredTool
+except ImportError:  # Tools fall back to plain (sync-only) functions
+    StructuredTool = None
+
+from search_cache import SearchCache, CacheKey, search_cache_key, open_shared_cache
+from query_canonical import NearDuplicateIndex
+from singleflight import SingleFlight, SINGLEFLIGHT_LOCK_DIR
+from rate_limit import open_search_limiter
+from search_backends import open_search_backend
+from circuit_breaker import CircuitBreaker
+from search_compaction import iter_compacted, result_url, SEARCH_COMPACTION_STATS
+from token_count import count_tokens
+from research_corpus import open_research_corpus
+
+# Threads for blocking DuckDuckGo calls, shared by every agent run
+SEARCH_IO_THREADS = int(os.getenv('SEARCH_IO_THREADS', '4'))
+
+# Per-request DuckDuckGo timeout (seconds)
+SEARCH_TIMEOUT = float(os.getenv('SEARCH_TIMEOUT', '10'))
+
+# Maximum concurrent queries per internet_search_many call
+SEARCH_BATCH_CONCURRENCY = int(os.getenv('SEARCH_BATCH_CONCURRENCY', '4'))
+
+# Maximum queries accepted by one internet_search_many call
+SEARCH_BATCH_MAX_QUERIES = int(os.getenv('SEARCH_BATCH_MAX_QUERIES', '10'))
+
+# Reciprocal rank fusion constant for search_type="both" (higher flattens rank differences)
+SEARCH_RRF_K = int(os.getenv('SEARCH_RRF_K', '60'))
+
+# Raw results shared by every agent in this process
+SEARCH_CACHE = SearchCache()
+
+# Raw results shared by every process on this host (None if disabled)
+SHARED_SEARCH_CACHE = open_shared_cache()
+
+# Finds cached paraphrases of a query that missed the cache
+QUERY_INDEX = NearDuplicateIndex()
+
+# Paces DuckDuckGo requests across threads and processes
+SEARCH_RATE_LIMITER = open_search_limiter()
+
+# Fails searches fast while DuckDuckGo keeps failing
+SEARCH_BREAKER = CircuitBreaker()
+
+# Serve expired shared-cache results when a search cannot be completed
+SEARCH_SERVE_STALE = os.getenv('SEARCH_SERVE_STALE', 'true').lower() == 'true'
+
+# Every fetched result, indexed for local-first and offline research (None if disabled)
+RESEARCH_CORPUS = open_research_corpus()
+
+# Never call DuckDuckGo; answer from the caches and the research corpus only
+SEARCH_OFFLINE = os.getenv('SEARCH_OFFLINE', 'false').lower() == 'true'
+
+# Coalesces concurrent identical searches (across processes with a lock dir)
+SEARCH_FLIGHTS = SingleFlight(SINGLEFLIGHT_LOCK_DIR)
+
+# Receives every result a search hands to the LLM, for the current request only
+SEARCH_LISTENER: contextvars.ContextVar[Optional[Callable[[Dict[str, Any]], None]]] = contextvars.ContextVar(
+    'search_listener', default=None
+)
+
+@contextmanager
+def search_listener(listener: Callable[[Dict[str, Any]], None]) -> Iterator[None]:
+    """
+    Send search hits made in this context (including agent tool calls) to a listener.
+
+    Args:
+        listener: Called with {'query', 'search_type', 'title', 'url'} per result
+    """
+
+    token = SEARCH_LISTENER.set(listener)
+    try:
+        yield
+    finally:
+        SEARCH_LISTENER.reset(token)
+
+def _emit(query: str, search_type: str, results: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Pass results through, reporting each one to the current listener."""
+
+    listener = SEARCH_LISTENER.get()
+    for r in results:
+        if listener is not None:
+            listener({'query': query, 'search_type': search_type, 'title': r['title'], 'url': r['href']})
+        yield r
+
+# The shared cache is SQLite (busy timeout, periodic compaction), so its calls
+# run on the default executor and never stall the search loop
+
+async def _acache_get_exact(key: CacheKey) -> Optional[List[Dict[str, Any]]]:
+    cached = SEARCH_CACHE.get(key)
+    if cached is None and SHARED_SEARCH_CACHE is not None:
+        shared = await asyncio.get_running_loop().run_in_executor(None, SHARED_SEARCH_CACHE.get, key)
+        if shared is not None:
+            cached, ttl = shared
+            SEARCH_CACHE.set(key, cached, ttl)
+            QUERY_INDEX.add(key)
+    return cached
+
+async def acache_get(key: CacheKey) -> Optional[List[Dict[str, Any]]]:
+    """Look up results in the in-process cache, then the shared cache, then cached paraphrases."""
+
+    cached = await _acache_get_exact(key)
+    if cached is None:
+        similar = QUERY_INDEX.find(key)
+        if similar is not None:
+            cached = await _acache_get_exact(similar)
+            if cached is None:
+                QUERY_INDEX.discard(similar)
+            else:
+                cached = cached[:key[1]]
+    return cached
+
+async def acache_get_stale(key: CacheKey) -> Optional[List[Dict[str, Any]]]:
+    """Look up expired results kept by the shared cache (None if disabled or absent)."""
+
+    if not SEARCH_SERVE_STALE or SHARED_SEARCH_CACHE is None:
+        return None
+    return await asyncio.get_running_loop().run_in_executor(None, SHARED_SEARCH_CACHE.get_stale, key)
+
+async def acache_set(key: CacheKey, results: List[Dict[str, Any]]) -> None:
+    """Store results in both cache tiers."""
+
+    SEARCH_CACHE.set(key, results)
+    if SHARED_SEARCH_CACHE is not None:
+        await asyncio.get_running_loop().run_in_executor(None, SHARED_SEARCH_CACHE.set, key, results)
+    QUERY_INDEX.add(key)
+
+# ============================================================================
+# BACKGROUND EVENT LOOP
+# ============================================================================
+
+class _SearchLoop:
+    """
+    Event loop on a daemon thread that runs every search coroutine.
+
+    Sync callers submit coroutines and wait for the result; backoff sleeps
+    and coalesced waits cost no thread while they are pending. Blocking
+    DuckDuckGo calls run on a small bounded executor.
+    """
+
+    def __init__(self, io_threads: int):
+        self.io_threads = io_threads
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Get the loop, starting its thread on first use."""
+
+        with self._lock:
+            if self._loop is None:
+                # Started lazily so forked server workers each get their own
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='search-loop', daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def executor(self) -> ThreadPoolExecutor:
+        """Get the bounded executor for blocking search calls."""
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.io_threads, thread_name_prefix='search-io'
+                )
+            return self._executor
+
+    def run(self, coro: Coroutine) -> Any:
+        """
+        Run a coroutine on the loop and wait for its result.
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            The coroutine's result
+        """
+
+        loop = self.loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Sync search called from the search loop; await the async variant instead")
+        # Tasks on the loop start from the loop's context; carry the caller's
+        # (e.g. its SEARCH_LISTENER) over so the search behaves as if awaited
+        context = list(contextvars.copy_context().items())
+        return asyncio.run_coroutine_threadsafe(_in_context(coro, context), loop).result()
+
+    async def arun(self, coro: Coroutine) -> Any:
+        """
+        Await a coroutine on the loop from any other event loop.
+
+        Async callers (e.g. agents driven with asyncio.run) hand their
+        searches over here so every search shares one flight table, one
+        backoff clock and one set of cache connections.
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            The coroutine's result
+        """
+
+        loop = self.loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        context = list(contextvars.copy_context().items())
+        # Cancelling the await cancels the task on the search loop too
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(_in_context(coro, context), loop))
+
+async def _in_context(coro: Coroutine, context: List[Tuple[contextvars.ContextVar, Any]]) -> Any:
+    for var, value in context:
+        var.set(value)
+    return await coro
+
+SEARCH_LOOP = _SearchLoop(SEARCH_IO_THREADS)
+
+# DuckDuckGo (pooled clients, one idle client per I/O thread) or a fixture stand-in
+SEARCH_BACKEND = open_search_backend(SEARCH_TIMEOUT, max_idle=SEARCH_IO_THREADS)
+
+# ============================================================================
+# SEARCH WITH JITTERED BACKOFF
+# ============================================================================
+
+def fetch_results(query: str, max_results: int, search_type: str) -> List[Dict[str, Any]]:
+    """
+    Run one query on the search backend (no retries, no cache).
+
+    Args:
+        query: Search query string
+        max_results: Maximum number of results to return
+        search_type: Type of search ("general" or "news")
+
+    Returns:
+        Raw result dictionaries from the backend
+    """
+
+    return SEARCH_BACKEND.search(query, max_results, search_type)
+
+def format_results(raw_results: List[Dict[str, Any]]) -> str:
+    """
+    Format raw search results as markdown for the LLM.
+
+    Args:
+        raw_results: Raw result dictionaries
+
+    Returns:
+        Formatted string with search results
+    """
+
+    if not raw_results:
+        return "No results found for this query."
+
+    results = list(iter_formatted(raw_results))
+    if not results:
+        return "No valid results found after quality filtering."
+
+    return "\n".join(results)
+
+def iter_formatted(raw_results: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Format results one markdown entry at a time (results without a title or URL are skipped)."""
+
+    for i, r in enumerate(raw_results, 1):
+        title = r.get('title', '')
+        url = r.get('href', r.get('url', ''))
+        snippet = r.get('body', r.get('description', ''))
+
+        if title and url:
+            yield f"{i}. **{title}**\n   URL: {url}\n   {snippet}\n"
+
+class SearchError(Exception):
+    """Raised when a search could not be completed."""
+
+class SearchUnavailable(SearchError):
+    """Raised without calling DuckDuckGo while the circuit breaker is open."""
+
+def backoff_delay(backoff: float, max_backoff: float = 60.0) -> float:
+    """Jittered delay in [backoff/2, backoff] so retries from many runs spread out."""
+
+    ceiling = min(backoff, max_backoff)
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+async def _afetch_with_backoff(key: CacheKey, query: str, max_results: int, search_type: str) -> List[Dict[str, Any]]:
+    """Query DuckDuckGo with jittered backoff and cache the results."""
+
+    max_retries = 5
+    backoff = 1.0
+    loop = asyncio.get_running_loop()
+
+    if SEARCH_OFFLINE:
+        raise SearchUnavailable("Web search is disabled (offline mode).")
+
+    # The breaker counts this call once, however many attempts it takes
+    if not SEARCH_BREAKER.allow():
+        raise SearchUnavailable(
+            f"Search is temporarily unavailable (retry in {SEARCH_BREAKER.retry_in():.0f}s)."
+        )
+
+    try:
+        for attempt in range(max_retries):
+            if attempt and SEARCH_BREAKER.retry_in() > 0:
+                # Other searches opened the breaker meanwhile; stop retrying
+                SEARCH_BREAKER.cancel()
+                raise SearchUnavailable(
+                    f"Search is temporarily unavailable (retry in {SEARCH_BREAKER.retry_in():.0f}s)."
+                )
+
+            # Retries queue for a slot too, so failures do not turn into bursts
+            await SEARCH_RATE_LIMITER.acquire()
+            try:
+                raw_results = await loop.run_in_executor(
+                    SEARCH_LOOP.executor(), fetch_results, query, max_results, search_type
+                )
+            except Exception:
+                if attempt < max_retries - 1:
+                    # Sleeping on the loop holds no thread
+                    await asyncio.sleep(backoff_delay(backoff))
+                    backoff *= 2
+            else:
+                SEARCH_BREAKER.record_success()
+                break
+        else:
+            SEARCH_BREAKER.record_failure()
+            raise SearchError(f"Could not complete search after {max_retries} attempts.")
+    except asyncio.CancelledError:
+        SEARCH_BREAKER.cancel()
+        raise
+
+    await acache_set(key, raw_results)
+    if RESEARCH_CORPUS is not None:
+        await loop.run_in_executor(None, RESEARCH_CORPUS.add, raw_results, search_type)
+    return raw_results
+
+async def asearch_raw(query: str, max_results: int = 5, search_type: str = "general") -> List[Dict[str, Any]]:
+    """
+    Get raw search results from the caches or DuckDuckGo.
+
+    Concurrent identical searches are coalesced: only one of them queries
+    DuckDuckGo and the others share its results. If the search fails (or
+    the circuit breaker is open), expired results from the shared cache are
+    served instead when available.
+
+    Args:
+        query: Search query string
+        max_results: Maximum number of results to return (per type for "both")
+        search_type: Type of search ("general", "news", or "both" for both fused)
+
+    Returns:
+        Raw result dictionaries (shared, treat as read-only)
+
+    Raises:
+        SearchError: If every attempt failed and nothing stale was cached
+    """
+
+    if search_type == "both":
+        return await _asearch_both(query, max_results)
+
+    key = search_cache_key(query, max_results, search_type)
+    cached = await acache_get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        return await SEARCH_FLIGHTS.ado(
+            key,
+            lambda: _afetch_with_backoff(key, query, max_results, search_type),
+            recheck=lambda: acache_get(key)
+        )
+    except SearchError:
+        stale = await acache_get_stale(key)
+        if stale is None:
+            raise
+        return stale
+
+def render_results(
+    raw_results: List[Dict[str, Any]],
+    token_budget: Optional[int] = None,
+    query: Optional[str] = None,
+    search_type: str = "general"
+) -> str:
+    """
+    Compact raw results to a token budget and format them for the LLM.
+
+    Args:
+        raw_results: Raw result dictionaries
+        token_budget: Token cap for this call (None for the global default)
+        query: Query to report kept results under to the current listener
+            (None if they were already reported)
+        search_type: Search type reported with the results
+
+    Returns:
+        Formatted string with search results
+    """
+
+    full = format_results(raw_results)
+    compacted = iter_compacted(raw_results, token_budget)
+    if query is not None:
+        compacted = _emit(query, search_type, compacted)
+    compacted = list(compacted)
+    text = format_results(compacted) if compacted else full
+    SEARCH_COMPACTION_STATS.record(count_tokens(full), count_tokens(text), len(raw_results), len(compacted))
+    return text
+
+async def _asearch_corpus(query: str, max_results: int, search_type: str) -> Tuple[List[Dict[str, Any]], bool]:
+    if RESEARCH_CORPUS is None:
+        return [], False
+    loop = asyncio.get_running_loop()
+    if search_type == "both":
+        found = await asyncio.gather(*(
+            loop.run_in_executor(None, RESEARCH_CORPUS.search, query, max_results, t) for t in ("general", "news")
+        ))
+        # Local answers only when both kinds of research are covered
+        return fuse_results([results for results, _ in found]), all(relevant for _, relevant in found)
+    return await loop.run_in_executor(None, RESEARCH_CORPUS.search, query, max_results, search_type)
+
+async def _asearch_text(query: str, max_results: int, search_type: str, token_budget: Optional[int]) -> str:
+    try:
+        return render_results(await asearch_raw(query, max_results, search_type), token_budget, query, search_type)
+    except SearchError as e:
+        # Closest past research beats no answer during an outage or offline run
+        results, _ = await _asearch_corpus(query, max_results, search_type)
+        if results:
+            return (f"{e} Closest results from past research:\n\n"
+                    + render_results(results, token_budget, query, search_type))
+        return f"Error: {e}"
+
+async def _alocal_search_text(query: str, max_results: int, search_type: str, token_budget: Optional[int]) -> str:
+    results, relevant = await _asearch_corpus(query, max_results, search_type)
+    if relevant:
+        return "From past research:\n\n" + render_results(results, token_budget, query, search_type)
+    return await _asearch_text(query, max_results, search_type, token_budget)
+
+async def ainternet_search(
+    query: str,
+    max_results: int = 5,
+    search_type: Literal["general", "news", "both"] = "general"
+) -> str:
+    """
+    Search the internet using DuckDuckGo with progressive backoff (up to 60s).
+
+    Args:
+        query: Search query string
+        max_results: Maximum number of results to return
+        search_type: Type of search ("general", "news", or "both" to run both at once, e.g. for market trends)
+
+    Returns:
+        Formatted string with search results
+    """
+
+    return await SEARCH_LOOP.arun(_asearch_text(query, max_results, search_type, None))
+
+def internet_search(
+    query: str,
+    max_results: int = 5,
+    search_type: Literal["general", "news", "both"] = "general"
+) -> str:
+    """
+    Search the internet using DuckDuckGo with progressive backoff (up to 60s).
+
+    Args:
+        query: Search query string
+        max_results: Maximum number of results to return
+        search_type: Type of search ("general", "news", or "both" to run both at once, e.g. for market trends)
+
+    Returns:
+        Formatted string with search results
+    """
+
+    return SEARCH_LOOP.run(_asearch_text(query, max_results, search_type, None))
+
+async def alocal_research_search(
+    query: str,
+    max_results: int = 5,
+    search_type: Literal["general", "news", "both"] = "general"
+) -> str:
+    """
+    Search past research first, and the internet only if nothing relevant is stored.
+
+    Faster than internet_search for topics researched before (market sizes,
+    known competitors, industry benchmarks). Use internet_search when you
+    need the very latest information.
+
+    Args:
+        query: Search query string
+        max_results: Maximum number of results to return
+        search_type: Type of search ("general", "news", or "both" to run both at once, e.g. for market trends)
+
+    Returns:
+        Formatted string with search results
+    """
+
+    return await SEARCH_LOOP.arun(_alocal_search_text(query, max_results, search_type, None))
+
+def local_research_search(
+    query: str,
+    max_results: int = 5,
+    search_type: Literal["general", "news", "both"] = "general"
+) -> str:
+    """
+    Search past research first, and the internet only if nothing relevant is stored.
+
+    Faster than internet_search for topics researched before (market sizes,
+    known competitors, industry benchmarks). Use internet_search when you
+    need the very latest information.
+
+    Args:
+        query: Search query string
+        max_results: Maximum number of results to return
+        search_type: Type of search ("general", "news", or "both" to run both at once, e.g. for market trends)
+
+    Returns:
+        Formatted string with search results
+    """
+
+    return SEARCH_LOOP.run(_alocal_search_text(query, max_results, search_type, None))
+
+# ============================================================================
+# BATCHED SEARCH
+# ============================================================================
+
+def merge_results(result_lists: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Interleave result lists by rank, keeping the first occurrence of each URL.
+
+    Interleaving puts every query's top hits first, so a token budget cuts
+    the weakest results of all queries rather than every result of the last.
+
+    Args:
+        result_lists: Raw results per query, in query order
+
+    Returns:
+        Deduplicated raw results
+    """
+
+    seen = set()
+    merged = []
+    for rank in range(max((len(results) for results in result_lists), default=0)):
+        for results in result_lists:
+            if rank >= len(results):
+                continue
+            url = result_url(results[rank])
+            if url and url in seen:
+                continue
+            seen.add(url)
+            merged.append(results[rank])
+    return merged
+
+async def _asearch_many_text(
+    queries: List[str],
+    max_results: int,
+    search_type: str,
+    token_budget: Optional[int]
+) -> str:
+    unique = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+    if not unique:
+        return "Error: No queries given."
+    if len(unique) > SEARCH_BATCH_MAX_QUERIES:
+        return f"Error: At most {SEARCH_BATCH_MAX_QUERIES} queries per call."
+
+    semaphore = asyncio.Semaphore(SEARCH_BATCH_CONCURRENCY)
+
+    async def one(query: str) -> List[Dict[str, Any]]:
+        async with semaphore:
+            results = await asearch_raw(query, max_results, search_type)
+        if SEARCH_LISTENER.get() is not None:
+            # Report each query's hits as it completes, not when the slowest one does
+            for _ in _emit(query, search_type, iter_compacted(results, token_budget)):
+                pass
+        return results
+
+    outcomes = await asyncio.gather(*(one(q) for q in unique), return_exceptions=True)
+
+    failed = [q for q, o in zip(unique, outcomes) if isinstance(o, BaseException)]
+    if len(failed) == len(unique):
+        return f"Error: Could not complete any of the {len(unique)} searches."
+    formatted = render_results(
+        merge_results([o for o in outcomes if not isinstance(o, BaseException)]), token_budget
+    )
+    if failed:
+        formatted += "\n\nSearch failed for: " + "; ".join(failed)
+    return formatted
+
+async def ainternet_search_many(
+    queries: List[str],
+    max_results: int = 5,
+    search_type: Literal["general", "news", "both"] = "general"
+) -> str:
+    """
+    Run several internet searches at once and return one merged result list.
+
+    Use this instead of repeated internet_search calls when you need the same
+    kind of information for several subjects (e.g. one query per competitor).
+
+    Args:
+        queries: Search query strings (duplicates are searched once)
+        max_results: Maximum number of results per query
+        search_type: Type of search ("general", "news", or "both" to run both at once, e.g. for market trends)
+
+    Returns:
+        Formatted string with the merged results, deduplicated by URL
+    """
+
+    return await SEARCH_LOOP.arun(_asearch_many_text(queries, max_results, search_type, None))
+
+def internet_search_many(
+    queries: List[str],
+    max_results: int = 5,
+    search_type: Literal["general", "news", "both"] = "general"
+) -> str:
+    """
+    Run several internet searches at once and return one merged result list.
+
+    Use this instead of repeated internet_search calls when you need the same
+    kind of information for several subjects (e.g. one query per competitor).
+
+    Args:
+        queries: Search query strings (duplicates are searched once)
+        max_results: Maximum number of results per query
+        search_type: Type of search ("general", "news", or "both" to run both at once, e.g. for market trends)
+
+    Returns:
+        Formatted string with the merged results, deduplicated by URL
+    """
+
+    return SEARCH_LOOP.run(_asearch_many_text(queries, max_results, search_type, None))
+
+# ============================================================================
+# GENERAL + NEWS SEARCH
+# ============================================================================
+
+def fuse_results(result_lists: List[List[Dict[str, Any]]], k: int = SEARCH_RRF_K) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists with reciprocal rank fusion, deduplicated by URL.
+
+    Each result scores sum(1 / (k + rank)) over the lists it appears in, so a
+    page found by both searches outranks one found by only one of them.
+    Ties keep list order (the first list's result comes first).
+
+    Args:
+        result_lists: Raw results per search, best first
+        k: Fusion constant (60 is the usual choice)
+
+    Returns:
+        Deduplicated raw results, best fused score first
+    """
+
+    scores: Dict[str, float] = {}
+    first: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+    for list_index, results in enumerate(result_lists):
+        for rank, r in enumerate(results, 1):
+            url = result_url(r)
+            if not url:
+                continue
+            scores[url] = scores.get(url, 0.0) + 1.0 / (k + rank)
+            if url not in first:
+                first[url] = (rank, list_index, r)
+
+    ordered = sorted(scores, key=lambda url: (-scores[url], first[url][0], first[url][1]))
+    return [first[url][2] for url in ordered]
+
+async def _asearch_both(query: str, max_results: int) -> List[Dict[str, Any]]:
+    """General and news results for a query, searched concurrently and fused."""
+
+    outcomes = await asyncio.gather(
+        asearch_raw(query, max_results, "general"),
+        asearch_raw(query, max_results, "news"),
+        return_exceptions=True
+    )
+    found = [o for o in outcomes if not isinstance(o, BaseException)]
+    if not found:
+        # Both failed: surface the general search's error
+        raise outcomes[0]
+    return fuse_results(found)
+
+# ============================================================================
+# PER-AGENT TOOL VARIANTS
+# ============================================================================
+
+_search_tools: Dict[Tuple[str, int, str, Optional[int]], Any] = {}
+
+def _search_tool(name: str, doc: str, func, coroutine):
+    """Wrap a sync/async pair as one tool (plain function without langchain_core)."""
+
+    for fn in (func, coroutine):
+        fn.__name__ = name
+        fn.__doc__ = doc
+
+    if StructuredTool is None:
+        return func
+    return StructuredTool.from_function(
+        func=func, coroutine=coroutine, name=name, description=doc.strip()
+    )
+
+def make_search_tool(max_results: int = 5, search_type: str = "general", token_budget: Optional[int] = None):
+    """
+    Get an internet_search tool with the agent's default arguments.
+
+    The tool keeps the internet_search name, signature and docstring, so the
+    LLM sees the same tool with the agent's defaults. When langchain_core is
+    available it carries both implementations: agent.invoke uses the sync
+    wrapper and agent.ainvoke awaits the coroutine directly.
+
+    Args:
+        max_results: Default number of results for this agent
+        search_type: Default search type for this agent
+        token_budget: Token cap on each call's output (None for the global default)
+
+    Returns:
+        Search tool (StructuredTool, or a plain function without langchain_core)
+    """
+
+    key = ('internet_search', max_results, search_type, token_budget)
+    if key not in _search_tools:
+        def search(
+            query: str,
+            max_results: int = max_results,
+            search_type: Literal["general", "news", "both"] = search_type
+        ) -> str:
+            return SEARCH_LOOP.run(_asearch_text(query, max_results, search_type, token_budget))
+
+        async def asearch(
+            query: str,
+            max_results: int = max_results,
+            search_type: Literal["general", "news", "both"] = search_type
+        ) -> str:
+            return await SEARCH_LOOP.arun(_asearch_text(query, max_results, search_type, token_budget))
+
+        _search_tools[key] = _search_tool(
+            internet_search.__name__, internet_search.__doc__, search, asearch
+        )
+
+    return _search_tools[key]
+
+def make_search_many_tool(max_results: int = 5, search_type: str = "general", token_budget: Optional[int] = None):
+    """
+    Get an internet_search_many tool with the agent's default arguments.
+
+    Args:
+        max_results: Default number of results per query for this agent
+        search_type: Default search type for this agent
+        token_budget: Token cap on each call's output (None for the global default)
+
+    Returns:
+        Batched search tool (StructuredTool, or a plain function without langchain_core)
+    """
+
+    key = ('internet_search_many', max_results, search_type, token_budget)
+    if key not in _search_tools:
+        def search_many(
+            queries: List[str],
+            max_results: int = max_results,
+            search_type: Literal["general", "news", "both"] = search_type
+        ) -> str:
+            return SEARCH_LOOP.run(_asearch_many_text(queries, max_results, search_type, token_budget))
+
+        async def asearch_many(
+            queries: List[str],
+            max_results: int = max_results,
+            search_type: Literal["general", "news", "both"] = search_type
+        ) -> str:
+            return await SEARCH_LOOP.arun(_asearch_many_text(queries, max_results, search_type, token_budget))
+
+        _search_tools[key] = _search_tool(
+            internet_search_many.__name__, internet_search_many.__doc__, search_many, asearch_many
+        )
+
+    return _search_tools[key]
+
+def make_local_search_tool(max_results: int = 5, search_type: str = "general", token_budget: Optional[int] = None):
+    """
+    Get a local_research_search tool with the agent's default arguments.
+
+    Args:
+        max_results: Default number of results for this agent
+        search_type: Default search type for this agent
+        token_budget: Token cap on each call's output (None for the global default)
+
+    Returns:
+        Local-first search tool (StructuredTool, or a plain function without langchain_core)
+    """
+
+    key = ('local_research_search', max_results, search_type, token_budget)
+    if key not in _search_tools:
+        def search_local(
+            query: str,
+            max_results: int = max_results,
+            search_type: Literal["general", "news", "both"] = search_type
+        ) -> str:
+            return SEARCH_LOOP.run(_alocal_search_text(query, max_results, search_type, token_budget))
+
+        async def asearch_local(
+            query: str,
+            max_results: int = max_results,
+            search_type: Literal["general", "news", "both"] = search_type
+        ) -> str:
+            return await SEARCH_LOOP.arun(_alocal_search_text(query, max_results, search_type, token_budget))
+
+        _search_tools[key] = _search_tool(
+            local_research_search.__name__, local_research_search.__doc__, search_local, asearch_local
+        )
+
+    return _search_tools[key]
+
+def make_search_tools(
+    max_results: int = 5,
+    search_type: str = "general",
+    token_budget: Optional[int] = None
+) -> List[Any]:
+    """
+    Get the search tools an agent is built with.
+
+    Args:
+        max_results: Default number of results for this agent
+        search_type: Default search type for this agent
+        token_budget: Token cap on each call's output (None for the global default)
+
+    Returns:
+        [internet_search, internet_search_many] tools with the agent's
+        defaults, plus local_research_search when the corpus is enabled
+    """
+
+    tools = [
+        make_search_tool(max_results, search_type, token_budget),
+        make_search_many_tool(max_results, search_type, token_budget)
+    ]
+    if RESEARCH_CORPUS is not None:
+        tools.append(make_local_search_tool(max_results, search_type, token_budget))
+    return tools